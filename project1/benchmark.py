@@ -0,0 +1,173 @@
+"""
+Benchmarks of the ConnectFour environment and search hot paths
+
+Every benchmark runs on the same fixed mid-game positions, so results of
+different commits can be compared. Results are written to --output as JSON,
+with --baseline a previous results file is compared against:
+    python benchmark.py -o before.json
+    python benchmark.py -o after.json -b before.json
+"""
+import argparse
+import json
+import platform
+import time
+import timeit
+from math import inf
+from typing import Callable, Dict
+
+import numpy as np
+
+from connect_four_search import EvaluationCache, MoveOrderer, TranspositionTable
+from gym_connect_four import ConnectFourEnv
+import skeleton
+
+# Columns played alternately from the empty board, player 1 first
+POSITIONS = {
+    'opening': '33',
+    'early': '3324452',
+    'middle': '332445226611',
+    'crowded': '1466602036335361',
+    'late': '03063346605325614020',
+    'endgame': '203645015562052554346122',
+}
+
+
+def position_env(moves: str, readonly_observations: bool = False) -> ConnectFourEnv:
+    env = ConnectFourEnv(readonly_observations=readonly_observations)
+    for move in moves:
+        _, _, done, _ = env.step(int(move))
+        if done:
+            raise ValueError('position {} is already finished'.format(moves))
+        env.change_player()
+    return env
+
+
+def measure(function: Callable[[], object], min_seconds: float) -> Dict[str, float]:
+    """
+    Returns the best and median time per call over 5 repeats of at least min_seconds each
+    """
+    timer = timeit.Timer(function)
+    number, seconds = timer.autorange()
+    number = max(1, int(number * min_seconds / seconds))
+    times = [total / number for total in timer.repeat(repeat=5, number=number)]
+    return {'best_us': min(times) * 1e6, 'median_us': float(np.median(times)) * 1e6, 'calls': number}
+
+
+def bench_environment(min_seconds: float) -> Dict[str, dict]:
+    results = {}
+    for name, moves in POSITIONS.items():
+        env = position_env(moves)
+        action = sorted(env.available_moves())[0]
+
+        def step():
+            env.step(action)
+            env.pop()
+
+        def push():
+            env.push(action)
+            env.pop()
+
+        results['step/' + name] = measure(step, min_seconds)
+        results['push_pop/' + name] = measure(push, min_seconds)
+        results['is_win_state/' + name] = measure(env.is_win_state, min_seconds)
+        results['available_moves/' + name] = measure(env.available_moves, min_seconds)
+        results['board/' + name] = measure(lambda: env.board, min_seconds)
+    return results
+
+
+def bench_evaluation(min_seconds: float) -> Dict[str, dict]:
+    results = {}
+    for name, moves in POSITIONS.items():
+        env = position_env(moves, readonly_observations=True)
+        skeleton.EVAL_CACHE = None
+        results['eval/' + name] = measure(lambda: skeleton.eval(env), min_seconds)
+        skeleton.EVAL_CACHE = EvaluationCache()
+        results['eval_cached/' + name] = measure(lambda: skeleton.eval(env), min_seconds)
+        scored = skeleton.scored(env)
+        action = sorted(env.available_moves())[0]
+
+        def scored_push():
+            scored.push(action)
+            skeleton.eval(scored)
+            scored.pop()
+
+        results['scored_push_eval_pop/' + name] = measure(scored_push, min_seconds)
+        children = []
+        for action in sorted(env.available_moves()):
+            env.push(action)
+            children.append(env.board)
+            env.pop()
+        boards = np.array(children)
+        results['eval_batch/' + name] = measure(lambda: skeleton.eval_batch(boards), min_seconds)
+    return results
+
+
+def bench_search(depth: int) -> Dict[str, dict]:
+    """
+    Times one fixed depth search_move per position, with cold tables so every run does the same work
+    """
+    results = {}
+    skeleton.BOOK = None
+    skeleton.ENDGAME_CELLS = 0
+    # Forced moves would be played without searching
+    skeleton.THREAT_CHECK = False
+    skeleton.MAX_DEPTH = depth
+    for name, moves in POSITIONS.items():
+        env = position_env(moves, readonly_observations=True)
+        skeleton.TABLE = TranspositionTable()
+        skeleton.ORDERING = MoveOrderer(max_ply=depth + 1)
+        skeleton.EVAL_CACHE = None if skeleton.INCREMENTAL else EvaluationCache()
+        start_time = time.perf_counter()
+        move, stats = skeleton.search_move(env, inf)
+        seconds = time.perf_counter() - start_time
+        assert stats.source == "search", "{} was not searched".format(name)
+        results['search_d{}/{}'.format(depth, name)] = {
+            'best_us': seconds * 1e6,
+            'median_us': seconds * 1e6,
+            'calls': 1,
+            'move': move,
+            'nodes': stats.total_nodes,
+            'nodes_per_second': stats.total_nodes / seconds,
+        }
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict]) -> None:
+    print("{:<30} {:>12} {:>12} {:>8}".format("benchmark", "baseline us", "now us", "speedup"))
+    for name, result in results.items():
+        if name in baseline:
+            before = baseline[name]['best_us']
+            print("{:<30} {:>12.2f} {:>12.2f} {:>7.2f}x".format(name, before, result['best_us'], before / result['best_us']))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--output", help="Results file", default="benchmark_results.json")
+    parser.add_argument("-b", "--baseline", help="Results file to compare against")
+    parser.add_argument("-d", "--depth", help="Depth of the search benchmarks", type=int, default=5)
+    parser.add_argument("-t", "--min-time", help="Seconds every micro benchmark runs for", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    results.update(bench_environment(args.min_time))
+    results.update(bench_evaluation(args.min_time))
+    results.update(bench_search(args.depth))
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'time': time.time(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'results': results,
+        }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f)['results'])
+    else:
+        for name, result in results.items():
+            print("{:<30} {:>12.2f} us".format(name, result['best_us']))
+
+
+if __name__ == "__main__":
+    main()
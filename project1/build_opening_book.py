@@ -0,0 +1,71 @@
+"""
+Precomputes the opening book used by student_move in skeleton.py
+
+Every position up to --plies moves deep in which the student (player 1) is to
+move, whoever started the game, is searched --depth moves ahead and its best
+move is written to --output. Mirror images share one entry.
+"""
+import argparse
+import time
+
+from connect_four_search import Deadline
+from connect_four_search.book import book_key, write_book
+from gym_connect_four import BitBoard
+import skeleton
+
+
+def book_positions(plies: int):
+    """
+    Yields every canonical, unfinished position of at most plies moves with player 1 to move
+    """
+    seen = set()
+
+    def visit(state: BitBoard, player: int, depth: int):
+        key, mirrored = book_key(state)
+        if (key, player) in seen:
+            return
+        seen.add((key, player))
+        if player == 1:
+            yield state.mirrored() if mirrored else state.copy()
+        if depth == plies:
+            return
+        for col in state.available_moves():
+            bit = state.play(col, player)
+            if not state.is_win_at(bit) and not state.is_full():
+                yield from visit(state, -player, depth + 1)
+            state.undo(col)
+
+    # The student either starts or answers the server's first move
+    yield from visit(BitBoard(), 1, 0)
+    yield from visit(BitBoard(), -1, 0)
+
+
+def build_book(plies: int, depth: int) -> dict:
+    env = skeleton.env
+    moves = {}
+    start_time = time.time()
+    for state in book_positions(plies):
+        env.reset(board=state.to_array())
+        skeleton.TABLE.new_search()
+        skeleton.ORDERING.new_search()
+        move, _ = skeleton.root_search(env, min(depth, state.rows * state.cols - state.moves), None, Deadline())
+        moves[state.hash] = move
+        if len(moves) % 100 == 0:
+            print("{} positions, {:.0f}s".format(len(moves), time.time() - start_time))
+    return moves
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--plies", help="Deepest position in the book", type=int, default=4)
+    parser.add_argument("-d", "--depth", help="Search depth for every position", type=int, default=8)
+    parser.add_argument("-o", "--output", help="Book file", default=skeleton.BOOK_PATH)
+    args = parser.parse_args()
+
+    moves = build_book(args.plies, args.depth)
+    write_book(args.output, moves)
+    print("Wrote {} positions to {}".format(len(moves), args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+from connect_four_search.deepening import Deadline, SearchTimeout, iterative_deepening
+from connect_four_search.eval_cache import EvaluationCache
+from connect_four_search.evaluation import ScoredEnv, WindowCounts, WindowEvaluator, window_indices
+from connect_four_search.mcts import MCTS
+from connect_four_search.ordering import MoveOrderer
+from connect_four_search.parallel import RootSplitter
+from connect_four_search.pondering import Ponderer
+from connect_four_search.stats import SearchStats
+from connect_four_search.transposition import Bound, MIN_PLAYER_KEY, TranspositionTable, TTEntry
@@ -0,0 +1,64 @@
+import mmap
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from gym_connect_four import BitBoard
+
+MAGIC = b'C4OB'
+VERSION = 1
+# magic, version, number of entries
+HEADER = struct.Struct('<4sIQ')
+
+
+def book_key(state: BitBoard) -> Tuple[int, bool]:
+    """
+    Returns the key of the canonical orientation of state, the smaller Zobrist
+    hash of the position and its mirror image, and whether that is the mirror
+    """
+    return state.canonical_hash()
+
+
+def write_book(path: str, moves: Dict[int, int]) -> None:
+    """
+    Writes {canonical key: best move} as a header followed by the sorted keys
+    (uint64) and the moves (uint8) in the same order
+    """
+    keys = np.array(sorted(moves), dtype='<u8')
+    values = np.array([moves[key] for key in keys.tolist()], dtype=np.uint8)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+        f.write(keys.tobytes())
+        f.write(values.tobytes())
+
+
+class OpeningBook(object):
+    """
+    Description:
+        Best moves for early positions, read from a file written by write_book
+
+    Memory:
+        The file is memory-mapped and binary searched in place, so opening a
+        book costs no load time and every process shares the same pages
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self.__mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('{} is not an opening book of version {}'.format(path, VERSION))
+        self.keys = np.frombuffer(self.__mmap, dtype='<u8', count=count, offset=HEADER.size)
+        self.moves = np.frombuffer(self.__mmap, dtype=np.uint8, count=count, offset=HEADER.size + 8 * count)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, state: BitBoard) -> Optional[int]:
+        key, mirrored = book_key(state)
+        index = int(np.searchsorted(self.keys, key))
+        if index == len(self.keys) or int(self.keys[index]) != key:
+            return None
+        move = int(self.moves[index])
+        return state.mirror_move(move) if mirrored else move
@@ -0,0 +1,59 @@
+import time
+from math import inf
+from typing import Callable, Optional, Tuple
+
+
+class SearchTimeout(Exception):
+    """
+    Raised from inside a search when its deadline has passed
+    """
+
+
+class Deadline(object):
+
+    def __init__(self, seconds: float = inf):
+        self.end = time.time() + seconds
+
+    @classmethod
+    def at(cls, end: float) -> 'Deadline':
+        """
+        Deadline at the time.time() value end, used to pass a deadline to other processes
+        """
+        deadline = cls()
+        deadline.end = end
+        return deadline
+
+    def expired(self) -> bool:
+        return time.time() > self.end
+
+    def check(self) -> None:
+        if time.time() > self.end:
+            raise SearchTimeout()
+
+
+def iterative_deepening(search: Callable[[int, Optional[int], Deadline], Tuple[int, float]],
+                        time_budget: float,
+                        max_depth: int,
+                        start: Optional[Tuple[Optional[int], float, int]] = None) -> Tuple[Optional[int], float, int]:
+    """
+    Calls search(depth, previous_best_move, deadline) for depth 1, 2, 3... until
+    time_budget seconds have passed or max_depth is reached, and returns the
+    (move, score, depth) of the deepest search that completed
+
+    The first depth always runs to completion so that a move is returned even
+    when the budget is smaller than a single search. search must leave the
+    environment untouched when it raises SearchTimeout. start is the (move,
+    score, depth) of a search of the same position that already completed,
+    the search then goes on from the depth after it.
+    """
+    deadline = Deadline(time_budget)
+    best_move, best_score, completed_depth = start if start is not None else (None, -inf, 0)
+    for depth in range(completed_depth + 1, max_depth + 1):
+        try:
+            best_move, best_score = search(depth, best_move, deadline if completed_depth else Deadline())
+        except SearchTimeout:
+            break
+        completed_depth = depth
+        if deadline.expired():
+            break
+    return best_move, best_score, completed_depth
@@ -0,0 +1,62 @@
+from collections import OrderedDict
+from typing import Optional
+
+
+class EvaluationCache(object):
+    """
+    Description:
+        Heuristic scores of boards, keyed by the canonical hash of the board,
+        so that a leaf reached again in a later iteration or a later move is
+        not scored again
+
+    Replacement:
+        Holds at most capacity scores, when full the least recently used score
+        is dropped. Only use keys of boards the heuristic scores the same in
+        both orientations, as the canonical hash does not tell them apart.
+    """
+
+    def __init__(self, capacity: int = 1 << 18):
+        self.capacity = capacity
+        self.scores: 'OrderedDict[int, float]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def new_search(self) -> None:
+        """
+        Resets the counters, call once per move
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self.scores.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int) -> Optional[float]:
+        score = self.scores.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.scores.move_to_end(key)
+        return score
+
+    def put(self, key: int, score: float) -> None:
+        self.scores[key] = score
+        self.scores.move_to_end(key)
+        if len(self.scores) > self.capacity:
+            self.scores.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.scores),
+            'capacity': self.capacity,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
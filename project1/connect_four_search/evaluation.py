@@ -0,0 +1,153 @@
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+def window_indices(rows: int = 6, cols: int = 7, length: int = 4) -> np.ndarray:
+    """
+    Flat board indices of every horizontal, vertical and diagonal window of
+    length cells, shape (windows, length), 69 windows on the standard board
+    """
+    windows = []
+    for row in range(rows):
+        for col in range(cols):
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                end_row = row + d_row * (length - 1)
+                end_col = col + d_col * (length - 1)
+                if 0 <= end_row < rows and end_col < cols:
+                    windows.append([(row + d_row * i) * cols + col + d_col * i for i in range(length)])
+    return np.array(windows, dtype=np.intp)
+
+
+class WindowEvaluator(object):
+    """
+    Description:
+        Scores boards by summing a score over every window of four cells, all
+        windows of all boards are gathered and scored in one numpy pass
+
+    Window score:
+        score_window(block) is called once per (own discs, opponent discs) count
+        when the evaluator is built, so it must only depend on those counts, as
+        the heuristics that look at the sum, min, max and zeros of a block do
+    """
+
+    def __init__(self, score_window: Callable[[np.ndarray], float], rows: int = 6, cols: int = 7, length: int = 4):
+        self.rows = rows
+        self.cols = cols
+        self.length = length
+        self.windows = window_indices(rows, cols, length)
+        table = np.zeros((length + 1, length + 1), dtype=np.int64)
+        for own in range(length + 1):
+            for opponent in range(length + 1 - own):
+                block = np.array([1] * own + [-1] * opponent + [0] * (length - own - opponent))
+                table[own, opponent] = score_window(block)
+        # Indexed by own * (length + 1) + opponent
+        self.table = table.ravel()
+        # Windows through every flat board index, the ones a disc dropped there changes
+        self.cell_windows = [[window for window, cells in enumerate(self.windows) if cell in cells]
+                             for cell in range(rows * cols)]
+
+    def evaluate_batch(self, boards: np.ndarray) -> np.ndarray:
+        """
+        Scores a stack of boards of shape (N, rows, cols) from the view of player 1
+        """
+        cells = boards.reshape(len(boards), self.rows * self.cols)[:, self.windows]
+        own = np.count_nonzero(cells == 1, axis=2)
+        opponent = np.count_nonzero(cells == -1, axis=2)
+        return self.table[own * (self.length + 1) + opponent].sum(axis=1)
+
+    def evaluate(self, board: np.ndarray) -> int:
+        return int(self.evaluate_batch(board[np.newaxis])[0])
+
+
+class WindowCounts(object):
+    """
+    Description:
+        The score of a WindowEvaluator kept up to date while discs are added
+        and removed, so that only the windows through the changed cell are
+        rescored instead of all of them
+
+    State:
+        windows  own * (length + 1) + opponent discs of every window, the index
+                 of its score in the table of the evaluator
+        score    sum of the scores of all windows and of the cell weights of
+                 all discs, the same as evaluate plus the weighted board
+    """
+
+    def __init__(self, evaluator: WindowEvaluator, board: np.ndarray, cell_weights: Optional[np.ndarray] = None):
+        if cell_weights is None:
+            cell_weights = np.zeros(board.shape, dtype=np.int64)
+        self.table = evaluator.table.tolist()
+        self.cell_windows = evaluator.cell_windows
+        self.steps = {1: evaluator.length + 1, -1: 1}
+        self.weights = cell_weights.ravel().tolist()
+        cells = board.reshape(-1)[evaluator.windows]
+        own = np.count_nonzero(cells == 1, axis=1)
+        opponent = np.count_nonzero(cells == -1, axis=1)
+        self.windows = (own * (evaluator.length + 1) + opponent).tolist()
+        self.score = sum(self.table[index] for index in self.windows) + int(cell_weights.ravel() @ board.reshape(-1))
+
+    def add(self, cell: int, player: int) -> None:
+        """
+        Adds a disc of player on the flat board index cell
+        """
+        table = self.table
+        windows = self.windows
+        step = self.steps[player]
+        score = self.score + self.weights[cell] * player
+        for window in self.cell_windows[cell]:
+            index = windows[window]
+            windows[window] = index + step
+            score += table[index + step] - table[index]
+        self.score = score
+
+    def remove(self, cell: int, player: int) -> None:
+        table = self.table
+        windows = self.windows
+        step = self.steps[player]
+        score = self.score - self.weights[cell] * player
+        for window in self.cell_windows[cell]:
+            index = windows[window]
+            windows[window] = index - step
+            score += table[index - step] - table[index]
+        self.score = score
+
+
+class ScoredEnv(object):
+    """
+    Description:
+        Wraps a ConnectFourEnv for the search, push and pop also update the
+        WindowCounts of the board, so that evaluating a leaf is reading score
+
+    Forwarding:
+        Everything else is forwarded to the environment. Only push and pop keep
+        the score, moves must not be made with step while the wrapper is used
+    """
+
+    def __init__(self, env, evaluator: WindowEvaluator, cell_weights: Optional[np.ndarray] = None):
+        self.env = getattr(env, 'unwrapped', env)
+        self.counts = WindowCounts(evaluator, self.env.board, cell_weights)
+        self.cells: List[Tuple[int, int]] = []
+
+    @property
+    def score(self) -> int:
+        return self.counts.score
+
+    def push(self, action: int) -> Tuple[float, bool]:
+        result = self.env.push(action)
+        state = self.env.state
+        bit = state.heights[action] - 1
+        row, col = state.cell(bit)
+        cell = row * state.cols + col
+        player = state.owner(bit)
+        self.counts.add(cell, player)
+        self.cells.append((cell, player))
+        return result
+
+    def pop(self) -> int:
+        cell, player = self.cells.pop()
+        self.counts.remove(cell, player)
+        return self.env.pop()
+
+    def __getattr__(self, name):
+        return getattr(self.env, name)
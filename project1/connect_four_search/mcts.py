@@ -0,0 +1,247 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from math import inf
+from typing import Dict, Optional, Tuple
+
+from gym_connect_four import BitBoard
+
+from connect_four_search.threats import winning_cells
+
+# Tree of the MCTS in a worker process, kept between moves so that it can be reused
+_WORKER_MCTS = None
+
+
+def _search_worker(exploration: float, rollout: str, seed: int, state: BitBoard, player: int,
+                   time_budget: float, iterations: int) -> Dict[int, Tuple[int, float]]:
+    global _WORKER_MCTS
+    if _WORKER_MCTS is None or (_WORKER_MCTS.exploration, _WORKER_MCTS.rollout) != (exploration, rollout):
+        _WORKER_MCTS = MCTS(exploration, rollout)
+    _WORKER_MCTS.rng.seed(seed)
+    root = _WORKER_MCTS.grow(state, player, time_budget, iterations)
+    return {move: (child.visits, child.value) for move, child in root.children.items()}
+
+
+class Node(object):
+    """
+    A position in the tree, reached by player playing move. value is the sum
+    of the results of the playouts through the node from the view of player,
+    1 for a win and 0.5 for a draw
+    """
+
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'visits', 'value', 'key', 'result')
+
+    def __init__(self, move: Optional[int], player: int, parent: Optional['Node'], state: BitBoard,
+                 result: Optional[float] = None):
+        self.move = move
+        self.player = player
+        self.parent = parent
+        self.children: Dict[int, 'Node'] = {}
+        self.untried = [] if result is not None else state.available_moves()
+        self.visits = 0
+        self.value = 0.0
+        self.key = state.hash
+        # Result for player when the game ended with move, None while it goes on
+        self.result = result
+
+
+class MCTS(object):
+    """
+    Description:
+        Monte Carlo tree search with UCT selection, as an alternative engine
+        to the alpha-beta search of skeleton.py
+
+    Rollouts:
+        'random' plays random moves to the end of the game, 'heuristic' plays
+        a winning move when there is one and blocks the opponent's immediate
+        win otherwise. Rollouts run on a copy of the bitboard of the position.
+
+    Tree reuse:
+        The tree of the previous search is kept, when the next position is
+        found within two plies of its root that subtree is searched further
+
+    Root parallelism:
+        With workers > 0 every worker process grows its own tree for the same
+        budget and the visits of the root moves are summed
+    """
+
+    def __init__(self, exploration: float = 1.4, rollout: str = 'heuristic', workers: int = 0,
+                 seed: Optional[int] = None):
+        self.exploration = exploration
+        self.rollout = rollout
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.root: Optional[Node] = None
+        self.executor = ProcessPoolExecutor(workers) if workers else None
+        self.iterations = 0
+        self.reused = 0
+        self.elapsed = 0.0
+
+    def best_move(self, state: BitBoard, player: int, time_budget: float = inf,
+                  iterations: int = 0) -> Tuple[Optional[int], float]:
+        """
+        Returns (move, win rate) of the most visited move for player, searching
+        for time_budget seconds or iterations playouts, whichever ends first
+        """
+        start_time = time.time()
+        if self.executor is None:
+            visits = {move: (child.visits, child.value)
+                      for move, child in self.grow(state, player, time_budget, iterations).children.items()}
+        else:
+            seeds = [self.rng.getrandbits(32) for _ in range(self.workers)]
+            futures = [self.executor.submit(_search_worker, self.exploration, self.rollout, seed, state, player,
+                                            time_budget, iterations) for seed in seeds]
+            visits = {}
+            self.iterations = 0
+            for future in futures:
+                for move, (count, value) in future.result().items():
+                    total_count, total_value = visits.get(move, (0, 0.0))
+                    visits[move] = (total_count + count, total_value + value)
+                    self.iterations += count
+        self.elapsed = time.time() - start_time
+        if not visits:
+            return None, 0.0
+        move = max(visits, key=lambda m: visits[m][0])
+        count, value = visits[move]
+        return move, value / count
+
+    def grow(self, state: BitBoard, player: int, time_budget: float = inf, iterations: int = 0) -> Node:
+        """
+        Grows the tree of state with player to move and returns its root
+        """
+        if time_budget == inf and not iterations:
+            raise ValueError("MCTS needs a time budget or a number of iterations")
+        root = self.find(state, player)
+        self.reused = root.visits if root is not None else 0
+        if root is None:
+            root = Node(None, -player, None, state)
+        root.parent = None
+        self.root = root
+        if not root.untried and not root.children:
+            self.iterations = 0
+            return root
+
+        state = state.copy()
+        end = time.time() + time_budget
+        done = 0
+        while (not iterations or done < iterations) and (done % 16 or time.time() < end):
+            self.iterate(root, state)
+            done += 1
+        self.iterations = done
+        return root
+
+    def find(self, state: BitBoard, player: int) -> Optional[Node]:
+        """
+        Looks for the position among the root of the previous tree and the two plies below it
+        """
+        nodes = [self.root] if self.root is not None else []
+        for _ in range(3):
+            for node in nodes:
+                if node.key == state.hash and node.player == -player:
+                    return node
+            nodes = [child for node in nodes for child in node.children.values()]
+        return None
+
+    def iterate(self, root: Node, state: BitBoard) -> None:
+        node = root
+        played = []
+        # Selection of explored nodes with the highest upper confidence bound
+        while node.result is None and not node.untried:
+            log_visits = math.log(node.visits)
+            node = max(node.children.values(),
+                       key=lambda child: child.value / child.visits
+                       + self.exploration * math.sqrt(log_visits / child.visits))
+            state.play(node.move, node.player)
+            played.append(node.move)
+
+        # Expansion of one untried move
+        if node.result is None:
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            player = -node.player
+            bit = state.play(move, player)
+            played.append(move)
+            result = None
+            if state.is_win_at(bit):
+                result = 1.0
+            elif state.is_full():
+                result = 0.5
+            child = Node(move, player, node, state, result)
+            node.children[move] = child
+            node = child
+
+        if node.result is not None:
+            winner = node.player if node.result == 1.0 else 0
+        else:
+            winner = self.playout(state, -node.player)
+        for move in reversed(played):
+            state.undo(move)
+
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.value += 1.0
+            elif winner == 0:
+                node.value += 0.5
+            node = node.parent
+
+    def playout(self, state: BitBoard, player: int) -> int:
+        """
+        Plays the game to the end from state with player to move and returns the winner, 0 for a draw
+        """
+        rows, cols = state.rows, state.cols
+        height = rows + 1
+        masks = list(state.masks)
+        heights = list(state.heights)
+        moves = state.moves
+        cells = rows * cols
+        columns = [col for col in range(cols) if heights[col] != col * height + rows]
+        heuristic = self.rollout == 'heuristic'
+        choice = self.rng.choice
+        while moves < cells:
+            index = 0 if player == 1 else 1
+            mask = masks[index]
+            col = None
+            if heuristic:
+                playable = 0
+                for c in columns:
+                    playable |= 1 << heights[c]
+                wins = winning_cells(mask, rows, cols) & playable
+                if wins:
+                    return player
+                blocks = winning_cells(masks[1 - index], rows, cols) & playable
+                if blocks:
+                    col = (blocks & -blocks).bit_length() // height
+            if col is None:
+                col = choice(columns)
+            bit = heights[col]
+            mask |= 1 << bit
+            masks[index] = mask
+            heights[col] = bit + 1
+            moves += 1
+            if bit + 1 == col * height + rows:
+                columns.remove(col)
+            if not heuristic and self.is_win(mask, height, rows):
+                return player
+            player = -player
+        return 0
+
+    @staticmethod
+    def is_win(mask: int, height: int, rows: int) -> bool:
+        for shift in (1, height, rows, height + 1):
+            pairs = mask & (mask >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
+
+    def stats(self) -> dict:
+        return {
+            'iterations': self.iterations,
+            'reused_visits': self.reused,
+            'seconds': self.elapsed,
+            'iterations_per_second': self.iterations / self.elapsed if self.elapsed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
@@ -0,0 +1,60 @@
+from typing import Iterable, List, Optional
+
+
+class MoveOrderer(object):
+    """
+    Description:
+        Orders the moves of a node so that the moves most likely to cause an
+        alpha-beta cutoff are searched first
+
+    Order:
+        1. best move from the transposition table or the previous iteration
+        2. killer moves, the last moves that caused a cutoff at the same ply
+        3. the rest by history score, ties broken by distance to the center column
+
+    History:
+        Every move that was best in a node or caused a cutoff gets depth * depth
+        added for its side, new_search halves all scores so that old games fade
+    """
+
+    def __init__(self, cols: int = 7, max_ply: int = 64, killers_per_ply: int = 2):
+        self.cols = cols
+        self.max_ply = max_ply
+        self.killers_per_ply = killers_per_ply
+        center = (cols - 1) / 2
+        self.center_order = sorted(range(cols), key=lambda col: abs(col - center))
+        self.center_rank = [self.center_order.index(col) for col in range(cols)]
+        self.clear()
+
+    def clear(self) -> None:
+        self.killers = [[] for _ in range(self.max_ply)]
+        self.history = [[0] * self.cols, [0] * self.cols]
+
+    def new_search(self) -> None:
+        self.killers = [[] for _ in range(self.max_ply)]
+        for side in self.history:
+            for col in range(self.cols):
+                side[col] //= 2
+
+    def order(self, moves: Iterable[int], ply: int, side: int = 0, best_move: Optional[int] = None) -> List[int]:
+        history = self.history[side]
+        center_rank = self.center_rank
+        ordered = sorted(moves, key=lambda col: (-history[col], center_rank[col]))
+        front = [best_move] if best_move is not None else []
+        front += [col for col in self.killers[ply] if col != best_move]
+        for col in reversed(front):
+            if col in ordered:
+                ordered.remove(col)
+                ordered.insert(0, col)
+        return ordered
+
+    def best(self, move: Optional[int], depth: int, side: int = 0) -> None:
+        if move is not None:
+            self.history[side][move] += depth * depth
+
+    def cutoff(self, move: int, ply: int, depth: int, side: int = 0) -> None:
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.killers_per_ply:]
+        self.best(move, depth, side)
@@ -0,0 +1,114 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+from math import inf
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from connect_four_search.deepening import Deadline, SearchTimeout
+from connect_four_search.stats import SearchStats
+
+# Best exact root score found so far, shared by all worker processes of a RootSplitter
+_ALPHA = None
+
+
+def _init_worker(alpha) -> None:
+    global _ALPHA
+    _ALPHA = alpha
+
+
+def _search_move(search_move: Callable[[np.ndarray, int, int, float, Deadline], Tuple[float, SearchStats]],
+                 board: np.ndarray, move: int, depth: int, deadline_end: float,
+                 full_window: bool) -> Tuple[float, float, SearchStats]:
+    alpha = -inf if full_window else _ALPHA.value
+    score, stats = search_move(board, move, depth, alpha, Deadline.at(deadline_end))
+    if score > alpha:
+        with _ALPHA.get_lock():
+            if score > _ALPHA.value:
+                _ALPHA.value = score
+    return score, alpha, stats
+
+
+class RootSplitter(object):
+    """
+    Description:
+        Searches the root moves of a position in a pool of worker processes
+
+    Search:
+        The first move is searched alone to get a bound (young brothers wait),
+        then the other moves are searched at the same time. Every worker starts
+        from the best exact score any worker has found so far, so a move that
+        cannot beat it is cut off early
+
+    Result:
+        search_move(board, move, depth, alpha, deadline) must be a module level
+        function returning the fail-soft score of move for the player to move
+        on board, together with the SearchStats of its search. The move
+        returned is the first move, in the given order, with the highest exact
+        score, which is the move a sequential alpha-beta over the same moves
+        returns
+
+    Statistics:
+        The counters of every search are merged into the stats passed to
+        search, also when the deadline passes. A search that runs out of time
+        gives its counters as the stats attribute of its SearchTimeout
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.alpha = multiprocessing.Value('d', -inf)
+        self.executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self.alpha,))
+
+    def search(self, search_move: Callable[[np.ndarray, int, int, float, Deadline], Tuple[float, SearchStats]],
+               board: np.ndarray, moves: List[int], depth: int, deadline: Deadline,
+               stats: Optional[SearchStats] = None) -> Tuple[Optional[int], float]:
+        if not moves:
+            return None, -inf
+        self.alpha.value = -inf
+
+        def submit(move, full_window=False):
+            return self.executor.submit(_search_move, search_move, board, move, depth, deadline.end, full_window)
+
+        def result(future):
+            try:
+                score, alpha, move_stats = future.result()
+            except SearchTimeout as error:
+                if stats is not None and getattr(error, 'stats', None) is not None:
+                    stats.merge(error.stats)
+                raise
+            if stats is not None:
+                stats.merge(move_stats)
+            return score, alpha
+
+        results = {moves[0]: result(submit(moves[0], True))}
+        futures = {move: submit(move) for move in moves[1:]}
+        wait(futures.values())
+        timeout = None
+        for move, future in futures.items():
+            # A timed out worker raises SearchTimeout here, after every worker has stopped,
+            # it is raised again once the counters of all workers are merged
+            try:
+                results[move] = result(future)
+            except SearchTimeout as error:
+                timeout = error
+        if timeout is not None:
+            raise timeout
+
+        # The first move was searched with a full window, so its score is exact
+        best_move, best_score = moves[0], results[moves[0]][0]
+        for move in moves[1:]:
+            score, alpha = results[move]
+            if score > alpha and score > best_score:
+                best_move, best_score = move, score
+
+        # A cut off move is only known to be no better than best_score, if it came
+        # first and may be as good the sequential search would have chosen it
+        for move in moves[:moves.index(best_move)]:
+            score, alpha = results[move]
+            if score <= alpha and score == best_score:
+                exact, _ = result(submit(move, True))
+                if exact == best_score:
+                    return move, best_score
+        return best_move, best_score
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
@@ -0,0 +1,71 @@
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from connect_four_search.deepening import Deadline, SearchTimeout
+
+
+class Ponderer(object):
+    """
+    Description:
+        Searches the positions the opponent can reply with in a background
+        thread while the opponent is thinking
+
+    Search:
+        search(position, depth, previous_best_move, deadline) is called for
+        depth 1, 2, 3... and for every position at each depth, most likely reply
+        first, so that all replies are searched about as deep when the opponent
+        answers. The search should share its transposition table with the
+        search of the next move, which then starts from a warm table.
+
+    Threads:
+        Only one search may run at a time, stop must be called before searching
+        in the main thread. The deadline passed to search expires on stop, so
+        the search must check it in its nodes.
+    """
+
+    def __init__(self, search: Callable[[object, int, Optional[int], Deadline], Tuple[int, float]]):
+        self.search = search
+        self.results: Dict[Hashable, Tuple[int, float, int]] = {}
+        self.deadline = Deadline()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def pondering(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, positions: List[Tuple[Hashable, object, int]]) -> None:
+        """
+        Starts searching the (key, position, max_depth) positions, most likely first
+        """
+        self.stop()
+        self.results = {}
+        self.deadline = Deadline()
+        self.thread = threading.Thread(target=self._run, args=(positions, self.deadline), daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is not None:
+            self.deadline.end = -1
+            self.thread.join()
+            self.thread = None
+
+    def result(self, key: Hashable) -> Optional[Tuple[int, float, int]]:
+        """
+        Stops pondering and returns the (move, score, depth) of the deepest
+        completed search of the position with key, None if it was not reached
+        """
+        self.stop()
+        return self.results.get(key)
+
+    def _run(self, positions: List[Tuple[Hashable, object, int]], deadline: Deadline) -> None:
+        depth = 1
+        while positions:
+            for key, position, max_depth in positions:
+                previous = self.results.get(key)
+                try:
+                    move, score = self.search(position, depth, previous[0] if previous else None, deadline)
+                except SearchTimeout:
+                    return
+                self.results[key] = (move, score, depth)
+            depth += 1
+            positions = [(key, position, max_depth) for key, position, max_depth in positions if depth <= max_depth]
@@ -0,0 +1,121 @@
+from typing import Dict, Optional, Tuple
+
+from gym_connect_four import BitBoard
+
+
+class EndgameSolver(object):
+    """
+    Description:
+        Exact solver for positions with few empty cells, negamax with alpha-beta
+        on bitboards and a null-window search to narrow down the score
+
+    Score:
+        From the view of the player to move, 0 for a draw, positive for a win
+        and negative for a loss. A win is worth more the sooner it comes: a win
+        with the player's own last disc on move m scores (cells + 1 - m) // 2,
+        a loss the negative of the opponent's win
+
+    Bitboards:
+        Search positions are (current, mask), the discs of the player to move
+        and all discs, which is all that is needed to play and undo by copying
+    """
+
+    def __init__(self, rows: int = 6, cols: int = 7):
+        self.rows = rows
+        self.cols = cols
+        self.cells = rows * cols
+        self.column_masks = [((1 << rows) - 1) << col * (rows + 1) for col in range(cols)]
+        self.bottom_masks = [1 << col * (rows + 1) for col in range(cols)]
+        self.top_masks = [1 << (rows - 1 + col * (rows + 1)) for col in range(cols)]
+        center = (cols - 1) / 2
+        self.order = sorted(range(cols), key=lambda col: abs(col - center))
+        self.table: Dict[int, int] = {}
+        self.nodes = 0
+
+    def _is_win(self, position: int) -> bool:
+        for shift in (1, self.rows + 1, self.rows, self.rows + 2):
+            pairs = position & (position >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
+
+    def _play(self, mask: int, col: int) -> int:
+        # Adding the bottom bit carries into the lowest empty cell of the column
+        return (mask + self.bottom_masks[col]) & self.column_masks[col]
+
+    def _can_play(self, mask: int, col: int) -> bool:
+        return not mask & self.top_masks[col]
+
+    def _negamax(self, current: int, mask: int, moves: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if moves == self.cells:
+            return 0
+        for col in range(self.cols):
+            if self._can_play(mask, col) and self._is_win(current | self._play(mask, col)):
+                return (self.cells + 1 - moves) // 2
+
+        # Nobody wins on the next move, so the best possible score is one move later
+        upper = (self.cells - 1 - moves) // 2
+        key = current + mask
+        stored = self.table.get(key)
+        if stored is not None:
+            upper = min(upper, stored)
+        if beta > upper:
+            beta = upper
+            if alpha >= beta:
+                return beta
+
+        for col in self.order:
+            if self._can_play(mask, col):
+                child_mask = mask | self._play(mask, col)
+                score = -self._negamax(current ^ mask, child_mask, moves + 1, -beta, -alpha)
+                if score >= beta:
+                    return score
+                if score > alpha:
+                    alpha = score
+        self.table[key] = alpha
+        return alpha
+
+    def _solve(self, current: int, mask: int, moves: int) -> int:
+        low = -(self.cells - moves) // 2
+        high = (self.cells + 1 - moves) // 2
+        while low < high:
+            # Null-window searches, probing scores near 0 first
+            mid = low + (high - low) // 2
+            if mid <= 0 and low // 2 < mid:
+                mid = low // 2
+            elif mid >= 0 and high // 2 > mid:
+                mid = high // 2
+            score = self._negamax(current, mask, moves, mid, mid + 1)
+            if score <= mid:
+                high = score
+            else:
+                low = score
+        return low
+
+    def solve(self, state: BitBoard, player: int) -> int:
+        """
+        Returns the exact score of state with player to move
+        """
+        self.table = {}
+        return self._solve(state.masks[BitBoard.player_index(player)], state.occupied, state.moves)
+
+    def best_move(self, state: BitBoard, player: int) -> Tuple[Optional[int], int]:
+        """
+        Returns (move, score) of the best move for player, center columns first among equals
+        """
+        self.table = {}
+        self.nodes = 0
+        current = state.masks[BitBoard.player_index(player)]
+        mask = state.occupied
+        best_move, best_score = None, -self.cells
+        for col in self.order:
+            if not self._can_play(mask, col):
+                continue
+            move = self._play(mask, col)
+            if self._is_win(current | move):
+                return col, (self.cells + 1 - state.moves) // 2
+            score = -self._solve(current ^ mask, mask | move, state.moves + 1)
+            if best_move is None or score > best_score:
+                best_move, best_score = col, score
+        return best_move, best_score
@@ -0,0 +1,108 @@
+import json
+import time
+from typing import List, Optional
+
+
+class SearchStats(object):
+    """
+    Description:
+        Counters collected while searching for one move
+
+    Counters:
+        nodes               nodes visited at every ply, the root is ply 0
+        cutoffs             nodes left early because a move was good enough
+        first_move_cutoffs  cutoffs caused by the first move searched, the
+                            share of these is a measure of the move ordering
+        evaluations         heuristic evaluations of leaf boards
+        iterations          depth, nodes, seconds and completion of every
+                            iterative deepening iteration
+        cache               counters of the transposition table
+        eval_cache          counters of the evaluation cache
+    """
+
+    def __init__(self, max_ply: int = 64):
+        self.start_time = time.time()
+        self.elapsed = 0.0
+        self.source = 'search'
+        self.move: Optional[int] = None
+        self.score: Optional[float] = None
+        self.depth = 0
+        self.nodes = [0] * max_ply
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.evaluations = 0
+        self.iterations: List[dict] = []
+        self.cache: dict = {}
+        self.eval_cache: dict = {}
+
+    @property
+    def total_nodes(self) -> int:
+        return sum(self.nodes)
+
+    def cutoff(self, first_move: bool) -> None:
+        self.cutoffs += 1
+        if first_move:
+            self.first_move_cutoffs += 1
+
+    def merge(self, other: 'SearchStats') -> None:
+        """
+        Adds the node, cutoff, evaluation and transposition table counters of a search run in another process
+        """
+        for ply, nodes in enumerate(other.nodes[:len(self.nodes)]):
+            self.nodes[ply] += nodes
+        self.cutoffs += other.cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.evaluations += other.evaluations
+        if other.cache:
+            cache = {key: self.cache.get(key, 0) + value for key, value in other.cache.items() if key != 'hit_rate'}
+            probes = cache['hits'] + cache['misses']
+            cache['hit_rate'] = cache['hits'] / probes if probes else 0.0
+            self.cache = cache
+
+    def iteration(self, depth: int, nodes: int, seconds: float, completed: bool) -> None:
+        self.iterations.append({'depth': depth, 'nodes': nodes, 'seconds': seconds, 'completed': completed})
+
+    def finish(self, source: str, move: Optional[int], score: Optional[float] = None, depth: int = 0) -> 'SearchStats':
+        self.elapsed = time.time() - self.start_time
+        self.source = source
+        self.move = move
+        self.score = score
+        self.depth = depth
+        return self
+
+    def branching_factor(self) -> float:
+        """
+        Effective branching factor of the deepest completed iteration
+        """
+        completed = [iteration for iteration in self.iterations if iteration['completed']]
+        if not completed:
+            return 0.0
+        return completed[-1]['nodes'] ** (1 / completed[-1]['depth'])
+
+    def as_dict(self) -> dict:
+        last_ply = max((ply for ply, nodes in enumerate(self.nodes) if nodes), default=-1)
+        return {
+            'time': self.start_time,
+            'source': self.source,
+            'move': self.move,
+            'score': self.score,
+            'depth': self.depth,
+            'seconds': self.elapsed,
+            'nodes': self.total_nodes,
+            'nodes_per_depth': self.nodes[:last_ply + 1],
+            'nodes_per_second': self.total_nodes / self.elapsed if self.elapsed else 0.0,
+            'branching_factor': self.branching_factor(),
+            'cutoffs': self.cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            'evaluations': self.evaluations,
+            'iterations': self.iterations,
+            'cache': self.cache,
+            'eval_cache': self.eval_cache,
+        }
+
+    def log(self, path: str) -> None:
+        """
+        Appends the statistics as one JSON line to path
+        """
+        with open(path, 'a') as f:
+            f.write(json.dumps(self.as_dict()) + '\n')
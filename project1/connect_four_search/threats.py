@@ -0,0 +1,103 @@
+from typing import List, NamedTuple, Optional
+
+from gym_connect_four import BitBoard
+
+
+def board_mask(rows: int, cols: int) -> int:
+    """
+    All cells of the board, without the sentinel bit on top of every column
+    """
+    return sum(((1 << rows) - 1) << col * (rows + 1) for col in range(cols))
+
+
+def winning_cells(position: int, rows: int, cols: int) -> int:
+    """
+    Cells that complete four in a row for the discs in position, whether they
+    are empty or not, as a bitboard in the layout of BitBoard
+    """
+    # vertical, only ever completed from above
+    cells = (position << 1) & (position << 2) & (position << 3)
+    # horizontal and both diagonals, the gap can be at any of the four places
+    for shift in (rows + 1, rows, rows + 2):
+        pairs = (position << shift) & (position << 2 * shift)
+        cells |= pairs & (position << 3 * shift)
+        cells |= pairs & (position >> shift)
+        pairs = (position >> shift) & (position >> 2 * shift)
+        cells |= pairs & (position << shift)
+        cells |= pairs & (position >> 3 * shift)
+    return cells & board_mask(rows, cols)
+
+
+def playable_cells(state: BitBoard) -> int:
+    """
+    The lowest empty cell of every column that is not full
+    """
+    return sum(1 << state.heights[col] for col in range(state.cols) if state.can_play(col))
+
+
+class Threats(NamedTuple):
+    """
+    Description:
+        Immediate threats of a position for the player to move, found with
+        bitboard masks before searching
+
+    Moves:
+        wins            columns that win at once
+        blocks          columns where the opponent wins next move unless they are played
+        safe            columns that do not let the opponent win on the cell right above
+        double_threats  safe columns after which the player has two wins at
+                        once, the opponent can only block one of them
+    """
+    wins: List[int]
+    blocks: List[int]
+    safe: List[int]
+    double_threats: List[int]
+
+    @property
+    def lost(self) -> bool:
+        """
+        The opponent wins next move whatever is played
+        """
+        return not self.wins and len(self.blocks) > 1
+
+    @property
+    def forced_move(self) -> Optional[int]:
+        """
+        The move to play without searching, None when the position needs a search
+        """
+        if self.wins:
+            return self.wins[0]
+        if self.blocks:
+            return self.blocks[0]
+        if self.double_threats:
+            return self.double_threats[0]
+        if len(self.safe) == 1:
+            return self.safe[0]
+        return None
+
+
+def find_threats(state: BitBoard, player: int) -> Threats:
+    rows, cols = state.rows, state.cols
+    own = state.masks[state.player_index(player)]
+    opponent = state.masks[state.player_index(-player)]
+    empty = board_mask(rows, cols) & ~(own | opponent)
+    playable = playable_cells(state)
+    own_wins = winning_cells(own, rows, cols) & empty
+    opponent_wins = winning_cells(opponent, rows, cols) & empty
+
+    wins, blocks, safe, double_threats = [], [], [], []
+    for col in state.available_moves():
+        bit = 1 << state.heights[col]
+        if own_wins & bit:
+            wins.append(col)
+        if opponent_wins & bit:
+            blocks.append(col)
+        # The sentinel above a full column is never a winning cell
+        if opponent_wins & (bit << 1):
+            continue
+        safe.append(col)
+        next_playable = (playable ^ bit) | ((bit << 1) & empty)
+        threats = winning_cells(own | bit, rows, cols) & empty & ~bit & next_playable
+        if threats & (threats - 1):
+            double_threats.append(col)
+    return Threats(wins, blocks, safe, double_threats)
@@ -0,0 +1,105 @@
+from enum import Enum, unique
+from typing import List, NamedTuple, Optional
+
+# Xor-ed into the Zobrist hash of positions searched by the minimising player,
+# so that a position reached with either side to move gets its own entry
+MIN_PLAYER_KEY = 0x9E3779B97F4A7C15
+
+
+@unique
+class Bound(Enum):
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+
+class TTEntry(NamedTuple):
+    key: int
+    depth: int
+    value: float
+    bound: Bound
+    move: Optional[int]
+    generation: int
+
+
+class TranspositionTable(object):
+    """
+    Description:
+        Fixed size hash table of search results keyed by the Zobrist hash of a
+        position
+
+    Replacement:
+        Every key maps to a single slot. A slot is overwritten by a result for
+        the same position, by a result searched at least as deep, or when the
+        stored result comes from an earlier call to new_search
+    """
+
+    def __init__(self, size: int = 1 << 20):
+        self.size = size
+        self.entries: List[Optional[TTEntry]] = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def new_search(self) -> None:
+        """
+        Ages the stored entries and resets the counters, call once per move
+        """
+        self.generation += 1
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def clear(self) -> None:
+        self.entries = [None] * self.size
+        self.new_search()
+
+    def probe(self, key: int) -> Optional[TTEntry]:
+        entry = self.entries[key % self.size]
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, value: float, bound: Bound, move: Optional[int] = None) -> None:
+        index = key % self.size
+        entry = self.entries[index]
+        if entry is None or entry.key == key or depth >= entry.depth or entry.generation != self.generation:
+            self.entries[index] = TTEntry(key, depth, value, bound, move, self.generation)
+            self.stores += 1
+
+    def cutoff(self, entry: TTEntry, depth: int, alpha: float, beta: float) -> Optional[float]:
+        """
+        Returns the stored value if it decides the node at this depth and window
+        """
+        if entry.depth < depth:
+            return None
+        if entry.bound is Bound.EXACT:
+            return entry.value
+        if entry.bound is Bound.LOWER and entry.value >= beta:
+            return entry.value
+        if entry.bound is Bound.UPPER and entry.value <= alpha:
+            return entry.value
+        return None
+
+    @staticmethod
+    def bound(value: float, alpha: float, beta: float) -> Bound:
+        """
+        Classifies a fail-soft alpha-beta result searched with window (alpha, beta)
+        """
+        if value <= alpha:
+            return Bound.UPPER
+        if value >= beta:
+            return Bound.LOWER
+        return Bound.EXACT
+
+    def stats(self) -> dict:
+        probes = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }
@@ -0,0 +1,303 @@
+"""
+Agents and the game loop shared by skeleton.py, skeleton_vivian.py and gpt_skeleton.py
+
+An agent is anything with select_move(state, time_budget) -> int, where state
+is the board with the agent's own discs as 1 and the opponent's as -1. The
+skeleton modules are agents themselves, so are the classes below. An agent may
+also have ponder(state), called with the board after its move while the
+opponent is thinking, and stop_pondering(), called when the game is over.
+
+Games between two agents, or against the server, are played by the same loop.
+Many games are played in parallel from the command line, for example
+    python game_driver.py -a skeleton -b random -g 20 -w 4 -t 0.5
+    python game_driver.py -a mcts --online --stand-in
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Protocol, Tuple
+
+import numpy as np
+
+from connect_four_search import MCTS
+from gym_connect_four import BitBoard, ConnectFourEnv
+from server_client import LocalServer, ServerClient, ServerError
+
+# Modules that implement select_move, loaded by name
+MODULE_AGENTS = {'skeleton': 'skeleton', 'vivian': 'skeleton_vivian', 'gpt': 'gpt_skeleton'}
+# One session per server account, so that every move reuses the connection to the server
+_CLIENTS: Dict[Tuple[str, Tuple[str, ...], str], ServerClient] = {}
+
+
+class Agent(Protocol):
+
+    def select_move(self, state: np.ndarray, time_budget: Optional[float] = None) -> int:
+        ...
+
+
+class RandomAgent(object):
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def select_move(self, state: np.ndarray, time_budget: Optional[float] = None) -> int:
+        return self.rng.choice([col for col in range(state.shape[1]) if state[0][col] == 0])
+
+
+class HumanAgent(object):
+    """
+    Asks for moves on the command line, so that the user can play against an agent
+    """
+
+    def select_move(self, state: np.ndarray, time_budget: Optional[float] = None) -> int:
+        print("Your discs are 1:")
+        print(state)
+        return int(input("Your move (between 0 and 6): "))
+
+
+class MCTSAgent(object):
+
+    def __init__(self, time_budget: float = 1.0, iterations: int = 0, rollout: str = 'heuristic', workers: int = 0):
+        self.time_budget = time_budget
+        self.iterations = iterations
+        self.mcts = MCTS(rollout=rollout, workers=workers)
+
+    def select_move(self, state: np.ndarray, time_budget: Optional[float] = None) -> int:
+        if time_budget is None:
+            time_budget = self.time_budget
+        move, _ = self.mcts.best_move(BitBoard.from_array(state), 1, time_budget, self.iterations)
+        return move
+
+
+def load_agent(name: str, seed: Optional[int] = None) -> Agent:
+    """
+    Agent by name: skeleton, vivian, gpt, mcts, random or human
+    """
+    if name in MODULE_AGENTS:
+        return importlib.import_module(MODULE_AGENTS[name])
+    if name == 'mcts':
+        return MCTSAgent()
+    if name == 'random':
+        return RandomAgent(seed)
+    if name == 'human':
+        return HumanAgent()
+    raise ValueError("Unknown agent {}".format(name))
+
+
+def client_for(agent: Agent, address: Optional[str] = None) -> ServerClient:
+    """
+    Client of the server at address, SERVER_ADDRESS of the agent by default,
+    for the STIL_ID and API_KEY of the agent
+    """
+    address = address or agent.SERVER_ADDRESS
+    stil_id, api_key = getattr(agent, 'STIL_ID', ["student-s"]), getattr(agent, 'API_KEY', "nyckel")
+    key = (address, tuple(stil_id), api_key)
+    if key not in _CLIENTS:
+        _CLIENTS[key] = ServerClient(address, stil_id, api_key)
+    return _CLIENTS[key]
+
+
+def check_stats(agent: Agent) -> dict:
+    return client_for(agent).stats()
+
+
+def board_after(state: np.ndarray, move: int) -> np.ndarray:
+    after = BitBoard.from_array(state)
+    after.play(move, 1)
+    return after.to_array(np.int8)
+
+
+def print_result(result: float) -> None:
+    if result == 1:
+        print("You won!")
+    elif result == 0.5:
+        print("It's a draw!")
+    elif result == -1:
+        print("You lost!")
+    elif result == -10:
+        print("You made an illegal move and have lost!")
+    else:
+        print("Unexpected result result={}".format(result))
+
+
+def stop_pondering(agent: Agent) -> None:
+    stop = getattr(agent, 'stop_pondering', None)
+    if stop is not None:
+        stop()
+
+
+def play_local_game(agent: Agent, opponent: Agent, agent_starts: Optional[bool] = None,
+                    time_budget: Optional[float] = None, verbose: bool = True) -> float:
+    """
+    Plays one game and returns the result for agent: 1 win, 0.5 draw, -1 loss
+    and -10 for a move into a full column. A full column played by the
+    opponent loses the game for the opponent.
+    """
+    env = ConnectFourEnv()
+    if agent_starts is None:
+        agent_starts = random.choice([True, False])
+    if verbose:
+        print("The agent starts!" if agent_starts else "The opponent starts!")
+        print()
+    # player 1 is the agent, the environment plays the discs of the current player
+    player = 1
+    if not agent_starts:
+        player = -1
+        env.change_player()
+    ponder = getattr(agent, 'ponder', None)
+    try:
+        while True:
+            mover = agent if player == 1 else opponent
+            move = mover.select_move(env.board * player, time_budget)
+            if not env.is_valid_action(move):
+                result = -10 if player == 1 else 1
+                break
+            _, reward, done, _ = env.step(move)
+            if done:
+                # reward is from the view of the player that moved
+                result = 0.5 if reward == ConnectFourEnv.DRAW_REWARD else player
+                break
+            if player == 1:
+                if ponder is not None:
+                    ponder(env.board)
+            elif verbose:
+                print("Current state (1 are the agent's discs, -1 are the opponent's, 0 is empty): ")
+                print(env.board)
+                print()
+            env.change_player()
+            player = -player
+    finally:
+        stop_pondering(agent)
+
+    if verbose:
+        print("Game over. ", end="")
+        print_result(result)
+        print("Final state (1 are the agent's discs, -1 are the opponent's, 0 is empty): ")
+        print(env.board)
+        print()
+    return result
+
+
+def play_server_game(agent: Agent, client: ServerClient, time_budget: Optional[float] = None,
+                     verbose: bool = True) -> float:
+    """
+    Plays one game against the server and returns the result for agent, raises ServerError on a bad response
+    """
+    # -1 signals the system to start a new game. any running game is counted as a loss
+    body = client.move(-1).json()
+    state = np.array(body['state'])
+    if verbose:
+        # This should tell you if you or the bot starts
+        print(body['msg'])
+        print("Current state (1 are student discs, -1 are servers, 0 is empty): ")
+        print(state)
+        print()
+    ponder = getattr(agent, 'ponder', None)
+    try:
+        while True:
+            move = agent.select_move(state, time_budget)
+            # the agent searches on the server's time when the move is legal
+            if ponder is not None and 0 <= move < state.shape[1] and state[0][move] == 0:
+                ponder(board_after(state, move))
+            body = client.move(move).json()
+            state = np.array(body['state'])
+            result = body['result']
+            if verbose:
+                print(body['msg'])
+                if result != 0:
+                    print_result(result)
+                else:
+                    print("Current state (1 are student discs, -1 are servers, 0 is empty): ")
+                print(state)
+                print()
+            if result != 0:
+                return result
+    finally:
+        stop_pondering(agent)
+
+
+def play_game(agent: Agent, vs_server: bool = False, client: Optional[ServerClient] = None,
+              opponent: Optional[Agent] = None, time_budget: Optional[float] = None) -> Optional[float]:
+    """
+    The game of the command line of every skeleton, against the server or
+    locally against opponent, a random agent by default. The server is
+    reached through client, client_for(agent) by default. Exits on a bad
+    response of the server, as the skeletons always have.
+
+    The reward for a game is as follows. You get a reward from the
+    server after each move, but it is 0 while the game is running
+    loss = -1
+    win = +1
+    draw = +0.5
+    error = -10 (you get this if you try to play in a full column)
+    """
+    if not vs_server:
+        return play_local_game(agent, opponent or RandomAgent(), time_budget=time_budget)
+    try:
+        return play_server_game(agent, client or client_for(agent), time_budget)
+    except ServerError as error:
+        print(error)
+        exit()
+
+
+def _play_games(agent_name: str, opponent_name: str, starts: List[bool], time_budget: Optional[float],
+                seed: int) -> List[float]:
+    agent = load_agent(agent_name, seed)
+    opponent = load_agent(opponent_name, seed + 1)
+    # The skeletons print every move
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [play_local_game(agent, opponent, agent_starts, time_budget, verbose=False) for agent_starts in starts]
+
+
+def play_games(agent_name: str, opponent_name: str, games: int, workers: int = 0,
+               time_budget: Optional[float] = None, seed: int = 0) -> List[float]:
+    """
+    Plays games between two agents in worker processes, half of them started
+    by each agent, and returns the results for the first agent. Every worker
+    loads its own agents, so the module globals of the skeletons are not shared.
+    """
+    workers = max(1, min(workers or games, games))
+    starts = [game % 2 == 0 for game in range(games)]
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(_play_games, agent_name, opponent_name, starts[worker::workers], time_budget,
+                                   seed + 2 * worker) for worker in range(workers)]
+        return [result for future in futures for result in future.result()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", "--agent", help="Agent: skeleton, vivian, gpt, mcts, random or human", default="skeleton")
+    parser.add_argument("-b", "--opponent", help="Opponent of local games, same choices", default="random")
+    parser.add_argument("-g", "--games", help="Local games to play", type=int, default=1)
+    parser.add_argument("-w", "--workers", help="Processes playing local games, one per game by default", type=int,
+                        default=0)
+    parser.add_argument("-t", "--time", help="Seconds per move of agents that take a time budget", type=float)
+    parser.add_argument("-s", "--seed", help="Seed of the random agents", type=int, default=0)
+    parser.add_argument("-o", "--online", help="Play one game of the agent against the server", action="store_true")
+    parser.add_argument("--stand-in", help="Play online against a local stand-in of the server", action="store_true")
+    args = parser.parse_args()
+
+    if args.online:
+        agent = load_agent(args.agent)
+        with contextlib.ExitStack() as stack:
+            address = getattr(agent, 'SERVER_ADDRESS', None)
+            if args.stand_in or address is None:
+                address = stack.enter_context(LocalServer()).address
+            play_game(agent, True, client_for(agent, address), time_budget=args.time)
+        return
+
+    if args.games == 1 and not args.workers:
+        play_local_game(load_agent(args.agent, args.seed), load_agent(args.opponent, args.seed + 1), time_budget=args.time)
+        return
+
+    results = play_games(args.agent, args.opponent, args.games, args.workers, args.time, args.seed)
+    wins, draws = results.count(1), results.count(0.5)
+    print("{} vs {}: {} wins, {} draws, {} losses in {} games".format(
+        args.agent, args.opponent, wins, draws, len(results) - wins - draws, len(results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from gym.envs.registration import register
+from .envs.bitboard import BitBoard, mirror_zobrist_keys, zobrist_keys
 from .envs.connect_four_env import ConnectFourEnv, ResultType
+from .envs.vector_connect_four_env import VectorConnectFourEnv
 
 register(
     id='ConnectFour-v0',
@@ -1 +1,3 @@
+from gym_connect_four.envs.bitboard import BitBoard, mirror_zobrist_keys, zobrist_keys
 from gym_connect_four.envs.connect_four_env import ConnectFourEnv, ResultType
+from gym_connect_four.envs.vector_connect_four_env import VectorConnectFourEnv
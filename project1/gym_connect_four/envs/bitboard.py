@@ -0,0 +1,253 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_ZOBRIST_KEYS: Dict[Tuple[int, int], Tuple[List[int], List[int]]] = {}
+_MIRROR_KEYS: Dict[Tuple[int, int], Tuple[List[int], List[int]]] = {}
+
+
+def zobrist_keys(rows: int, cols: int) -> Tuple[List[int], List[int]]:
+    """
+    Random 64 bit keys for every bit of player 1 and player -1, seeded by the
+    board shape so that hashes are the same in every process
+    """
+    keys = _ZOBRIST_KEYS.get((rows, cols))
+    if keys is None:
+        rng = random.Random(rows * 1000 + cols)
+        size = cols * (rows + 1)
+        keys = ([rng.getrandbits(64) for _ in range(size)],
+                [rng.getrandbits(64) for _ in range(size)])
+        _ZOBRIST_KEYS[(rows, cols)] = keys
+    return keys
+
+
+def mirror_zobrist_keys(rows: int, cols: int) -> Tuple[List[int], List[int]]:
+    """
+    Zobrist keys indexed by bit that belong to the bit mirrored around the center
+    column, xor-ing them gives the hash of the mirror image of a position
+    """
+    keys = _MIRROR_KEYS.get((rows, cols))
+    if keys is None:
+        mirror = [(cols - 1 - bit // (rows + 1)) * (rows + 1) + bit % (rows + 1)
+                  for bit in range(cols * (rows + 1))]
+        keys = tuple([player_keys[mirror[bit]] for bit in range(len(mirror))]
+                     for player_keys in zobrist_keys(rows, cols))
+        _MIRROR_KEYS[(rows, cols)] = keys
+    return keys
+
+
+class BitBoard(object):
+    """
+    Description:
+        Bitboard representation of a ConnectFour position
+
+    Layout:
+        Every column uses rows + 1 bits, the extra bit on top of each column is
+        a sentinel that is always 0 so that shifted masks never wrap from one
+        column into the next. Bit (col * (rows + 1) + h) is the cell in column
+        col at height h counted from the bottom row.
+
+             6 13 20 27 34 41 48
+            +--------------------+
+            | 5 12 19 26 33 40 47|
+            | 4 11 18 25 32 39 46|
+            | 3 10 17 24 31 38 45|
+            | 2  9 16 23 30 37 44|
+            | 1  8 15 22 29 36 43|
+            | 0  7 14 21 28 35 42|
+            +--------------------+
+
+    State:
+        masks[0]    discs of player 1
+        masks[1]    discs of player -1
+        heights     index of the next free bit of every column
+        hash        Zobrist hash of the discs, updated on every play and undo
+        mirror_hash Zobrist hash of the mirror image of the discs, updated the same way
+    """
+
+    __slots__ = ('rows', 'cols', 'masks', 'heights', 'moves', 'keys', 'hash', 'mirror_keys', 'mirror_hash')
+
+    def __init__(self, rows: int = 6, cols: int = 7):
+        self.rows = rows
+        self.cols = cols
+        self.masks = [0, 0]
+        self.heights = [col * (rows + 1) for col in range(cols)]
+        self.moves = 0
+        self.keys = zobrist_keys(rows, cols)
+        self.hash = 0
+        self.mirror_keys = mirror_zobrist_keys(rows, cols)
+        self.mirror_hash = 0
+
+    @staticmethod
+    def player_index(player: int) -> int:
+        return 0 if player == 1 else 1
+
+    @classmethod
+    def from_array(cls, board: np.ndarray) -> 'BitBoard':
+        rows, cols = board.shape
+        state = cls(rows, cols)
+        for col in range(cols):
+            # Discs are stacked from the bottom row (last index) upwards
+            for row in reversed(range(rows)):
+                player = board[row][col]
+                if player == 0:
+                    break
+                state.play(col, player)
+        return state
+
+    def copy(self) -> 'BitBoard':
+        other = BitBoard.__new__(BitBoard)
+        other.rows = self.rows
+        other.cols = self.cols
+        other.masks = list(self.masks)
+        other.heights = list(self.heights)
+        other.moves = self.moves
+        other.keys = self.keys
+        other.hash = self.hash
+        other.mirror_keys = self.mirror_keys
+        other.mirror_hash = self.mirror_hash
+        return other
+
+    def mirrored(self) -> 'BitBoard':
+        """
+        Returns the position reflected around the center column
+        """
+        other = BitBoard(self.rows, self.cols)
+        for col in range(self.cols):
+            for bit in range(col * (self.rows + 1), self.heights[col]):
+                other.play(self.cols - 1 - col, self.owner(bit))
+        return other
+
+    def canonical_hash(self) -> Tuple[int, bool]:
+        """
+        Returns the hash of the canonical orientation, the smaller of the hashes
+        of the position and of its mirror image, and whether that is the mirror
+        """
+        if self.mirror_hash < self.hash:
+            return self.mirror_hash, True
+        return self.hash, False
+
+    def is_symmetric(self) -> bool:
+        """
+        Whether the position is its own mirror image, then mirrored moves are equally good
+        """
+        column = (1 << (self.rows + 1)) - 1
+        for col in range(self.cols // 2):
+            left = col * (self.rows + 1)
+            right = (self.cols - 1 - col) * (self.rows + 1)
+            for mask in self.masks:
+                if (mask >> left) & column != (mask >> right) & column:
+                    return False
+        return True
+
+    def mirror_move(self, col: int) -> int:
+        return self.cols - 1 - col
+
+    @property
+    def occupied(self) -> int:
+        return self.masks[0] | self.masks[1]
+
+    def top_bit(self, col: int) -> int:
+        return col * (self.rows + 1) + self.rows
+
+    def can_play(self, col: int) -> bool:
+        return self.heights[col] != self.top_bit(col)
+
+    def play(self, col: int, player: int) -> int:
+        """
+        Drops a disc of player into col and returns the index of the bit it landed on
+        """
+        bit = self.heights[col]
+        index = self.player_index(player)
+        self.masks[index] |= 1 << bit
+        self.hash ^= self.keys[index][bit]
+        self.mirror_hash ^= self.mirror_keys[index][bit]
+        self.heights[col] = bit + 1
+        self.moves += 1
+        return bit
+
+    def undo(self, col: int) -> int:
+        """
+        Removes the top disc of col and returns the index of the bit it was on
+        """
+        bit = self.heights[col] - 1
+        index = 0 if (self.masks[0] >> bit) & 1 else 1
+        self.masks[index] &= ~(1 << bit)
+        self.hash ^= self.keys[index][bit]
+        self.mirror_hash ^= self.mirror_keys[index][bit]
+        self.heights[col] = bit
+        self.moves -= 1
+        return bit
+
+    def available_moves(self) -> List[int]:
+        return [col for col in range(self.cols) if self.can_play(col)]
+
+    def is_full(self) -> bool:
+        return self.moves == self.rows * self.cols
+
+    def cell(self, bit: int) -> Tuple[int, int]:
+        """
+        Converts a bit index to the (row, col) index of the numpy board
+        """
+        col, height = divmod(bit, self.rows + 1)
+        return self.rows - 1 - height, col
+
+    def bit(self, row: int, col: int) -> int:
+        """
+        Converts a (row, col) index of the numpy board to a bit index
+        """
+        return col * (self.rows + 1) + self.rows - 1 - row
+
+    def owner(self, bit: int) -> int:
+        if (self.masks[0] >> bit) & 1:
+            return 1
+        if (self.masks[1] >> bit) & 1:
+            return -1
+        return 0
+
+    def is_win_at(self, bit: int) -> bool:
+        """
+        Checks only the four lines running through the disc on bit, which is all
+        that can have changed since the previous position
+        """
+        player = self.owner(bit)
+        if player == 0:
+            return False
+        mask = self.masks[self.player_index(player)]
+        for shift in (1, self.rows + 1, self.rows, self.rows + 2):
+            count = 1
+            # The sentinel bits and the empty cells stop both walks
+            next_bit = bit + shift
+            while (mask >> next_bit) & 1:
+                count += 1
+                next_bit += shift
+            next_bit = bit - shift
+            while next_bit >= 0 and (mask >> next_bit) & 1:
+                count += 1
+                next_bit -= shift
+            if count >= 4:
+                return True
+        return False
+
+    def is_win(self, player: Optional[int] = None) -> bool:
+        if player is None:
+            return self.is_win(1) or self.is_win(-1)
+        mask = self.masks[self.player_index(player)]
+        # vertical, horizontal and both diagonals
+        for shift in (1, self.rows + 1, self.rows, self.rows + 2):
+            pairs = mask & (mask >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
+
+    def to_array(self, dtype=int) -> np.ndarray:
+        board = np.zeros((self.rows, self.cols), dtype=dtype)
+        for index, player in ((0, 1), (1, -1)):
+            mask = self.masks[index]
+            while mask:
+                low = mask & -mask
+                row, col = self.cell(low.bit_length() - 1)
+                board[row][col] = player
+                mask ^= low
+        return board
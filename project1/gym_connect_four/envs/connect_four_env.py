@@ -13,6 +13,7 @@ import pygame
 from gym import error
 from gym import spaces
 
+from gym_connect_four.envs.bitboard import BitBoard
 from gym_connect_four.envs.render import render_board
 
 @unique
@@ -35,7 +36,10 @@ class ConnectFourEnv(gym.Env):
         ConnectFour game environment
 
     Observation:
-        Type: Discreet(6,7)
+        Type: Discreet(6,7) of int8
+        With readonly_observations=True, step and board return a read-only
+        view of the board instead of a copy. The view never changes, the next
+        move creates a new board
 
     Actions:
         Type: Discreet(7)
@@ -51,6 +55,10 @@ class ConnectFourEnv(gym.Env):
     Starting State:
         All observations are assigned a value of 0
 
+    State:
+        The position is kept in a BitBoard, the numpy board returned by step and
+        board is only materialised when it is requested after a move
+
     Episode Termination:
         No more spaces left for pieces
         4 pieces are present in a line: horizontal, vertical or diagonally
@@ -80,7 +88,7 @@ class ConnectFourEnv(gym.Env):
         def is_done(self):
             return self.res_type != ResultType.NONE
 
-    def __init__(self, board_shape=(6, 7), window_width=512, window_height=512):
+    def __init__(self, board_shape=(6, 7), window_width=512, window_height=512, readonly_observations=False):
         super(ConnectFourEnv, self).__init__()
 
         self.board_shape = board_shape
@@ -88,17 +96,21 @@ class ConnectFourEnv(gym.Env):
         self.observation_space = spaces.Box(low=-1,
                                             high=1,
                                             shape=board_shape,
-                                            dtype=int)
+                                            dtype=np.int8)
         self.action_space = spaces.Discrete(board_shape[1])
 
         self.__current_player = 1
-        self.__board = np.zeros(self.board_shape, dtype=int)
+        self.__state = BitBoard(*board_shape)
+        self.__board = None
+        self.__history = []
+        self.__readonly_observations = readonly_observations
 
         self.__player_color = 1
         self.__screen = None
         self.__window_width = window_width
         self.__window_height = window_height
-        self.__rendered_board = self._update_board_render()
+        # Only drawn on the first render('human'), so headless training and search never pay for the image
+        self.__rendered_board = None
 
     def change_player(self):
         self.__current_player *= -1
@@ -107,7 +119,7 @@ class ConnectFourEnv(gym.Env):
         step_result = self._step(action)
         reward = step_result.get_reward(self.__current_player)
         done = step_result.is_done()
-        return self.__board.copy(), reward, done, {}
+        return self.board, reward, done, {}
 
     def _step(self, action: int) -> StepResult:
         result = ResultType.NONE
@@ -118,31 +130,63 @@ class ConnectFourEnv(gym.Env):
             )
 
         # Check and perform action
-        for index in list(reversed(range(self.board_shape[0]))):
-            if self.__board[index][action] == 0:
-                self.__board[index][action] = self.__current_player
-                break
+        self.__history.append((action, self.__current_player))
+        cell = self.__state.cell(self.__state.play(action, self.__current_player))
+        self.__board = None
 
         # Check if board is completely filled
-        if np.count_nonzero(self.__board[0]) == self.board_shape[1]:
+        if self.__state.is_full():
             result = ResultType.DRAW
         else:
             # Check win condition
-            if self.is_win_state():
+            if self.is_win_state(cell):
                 result = ResultType.WIN1 if self.__current_player == 1 else ResultType.WIN2
         return self.StepResult(result)
 
+    def push(self, action: int) -> Tuple[float, bool]:
+        """
+        Plays action for the current player in place and returns (reward, done)
+        without copying the board, the move is taken back with pop
+        """
+        step_result = self._step(action)
+        return step_result.get_reward(self.__current_player), step_result.is_done()
+
+    def pop(self) -> int:
+        """
+        Takes back the last move made by push or step and restores the player
+        that made it as the current player
+        """
+        action, player = self.__history.pop()
+        self.__state.undo(action)
+        self.__board = None
+        self.__current_player = player
+        return action
+
     @property
     def board(self):
-        return self.__board.copy()
+        if self.__readonly_observations:
+            return self._board_view()
+        return self._board_view().copy()
+
+    @property
+    def state(self) -> BitBoard:
+        return self.__state
+
+    def _board_view(self) -> np.ndarray:
+        if self.__board is None:
+            self.__board = self.__state.to_array(dtype=np.int8)
+            self.__board.flags.writeable = False
+        return self.__board
 
     def reset(self, board: Optional[np.ndarray] = None) -> np.ndarray:
         self.__current_player = 1
         if board is None:
-            self.__board = np.zeros(self.board_shape, dtype=int)
+            self.__state = BitBoard(*self.board_shape)
         else:
-            self.__board = board
-        self.__rendered_board = self._update_board_render()
+            self.__state = BitBoard.from_array(board)
+        self.__board = None
+        self.__history = []
+        self.__rendered_board = None
         return self.board
 
     def render(self, mode: str = 'console', close: bool = False) -> None:
@@ -161,7 +205,7 @@ class ConnectFourEnv(gym.Env):
             print(hline)
             for line in np.apply_along_axis(render_line,
                                             axis=1,
-                                            arr=self.__board):
+                                            arr=self._board_view()):
                 print(line)
             print(hline)
 
@@ -188,50 +232,21 @@ class ConnectFourEnv(gym.Env):
         pygame.quit()
 
     def is_valid_action(self, action: int) -> bool:
-        return self.__board[0][action] == 0
+        return self.__state.can_play(action)
 
     def _update_board_render(self) -> np.ndarray:
-        return render_board(self.__board,
+        return render_board(self._board_view(),
                             image_width=self.__window_width,
                             image_height=self.__window_height)
 
-    def is_win_state(self) -> bool:
-        # Test rows
-        for i in range(self.board_shape[0]):
-            for j in range(self.board_shape[1] - 3):
-                value = sum(self.__board[i][j:j + 4])
-                if abs(value) == 4:
-                    return True
-
-        # Test columns on transpose array
-        reversed_board = [list(i) for i in zip(*self.__board)]
-        for i in range(self.board_shape[1]):
-            for j in range(self.board_shape[0] - 3):
-                value = sum(reversed_board[i][j:j + 4])
-                if abs(value) == 4:
-                    return True
-
-        # Test diagonal
-        for i in range(self.board_shape[0] - 3):
-            for j in range(self.board_shape[1] - 3):
-                value = 0
-                for k in range(4):
-                    value += self.__board[i + k][j + k]
-                    if abs(value) == 4:
-                        return True
-
-        reversed_board = np.fliplr(self.__board)
-        # Test reverse diagonal
-        for i in range(self.board_shape[0] - 3):
-            for j in range(self.board_shape[1] - 3):
-                value = 0
-                for k in range(4):
-                    value += reversed_board[i + k][j + k]
-                    if abs(value) == 4:
-                        return True
-
-        return False
+    def is_win_state(self, cell: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Without a cell the whole board is checked, with the (row, col) of the last
+        dropped disc only the lines through that cell are
+        """
+        if cell is None:
+            return self.__state.is_win()
+        return self.__state.is_win_at(self.__state.bit(*cell))
 
     def available_moves(self) -> frozenset:
-        return frozenset(
-            (i for i in range(self.board_shape[1]) if self.is_valid_action(i)))
+        return frozenset(self.__state.available_moves())
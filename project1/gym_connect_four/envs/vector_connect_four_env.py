@@ -0,0 +1,126 @@
+from typing import Optional, Tuple
+
+import gym
+import numpy as np
+from gym import spaces
+
+from gym_connect_four.envs.connect_four_env import ConnectFourEnv
+
+
+class VectorConnectFourEnv(gym.Env):
+    """
+    Description:
+        num_envs ConnectFour games stepped at once, for self-play and data generation
+
+    Observation:
+        Type: Box(num_envs, 6, 7) of int8
+        1 for discs of player 1, -1 for discs of player -1, 0 for empty cells
+
+    Actions:
+        Type: MultiDiscrete([7] * num_envs)
+        Column in which every game drops the next disc of its current player
+
+    Reward:
+        Per game and from the view of the player that moved, with the values of
+        ConnectFourEnv: DEF_REWARD, DRAW_REWARD, WIN_REWARD, and LOSS_REWARD
+        for a move into a full column, which also ends the game
+
+    Players:
+        Unlike ConnectFourEnv the player changes after every move, current_player
+        holds the player to move in every game
+
+    Auto reset:
+        A finished game is reset right away, step returns its first observation
+        and puts the final board in info['final_observation']
+    """
+
+    def __init__(self, num_envs: int, board_shape=(6, 7), auto_reset: bool = True):
+        super(VectorConnectFourEnv, self).__init__()
+
+        self.num_envs = num_envs
+        self.board_shape = board_shape
+        self.auto_reset = auto_reset
+
+        self.observation_space = spaces.Box(low=-1,
+                                            high=1,
+                                            shape=(num_envs,) + tuple(board_shape),
+                                            dtype=np.int8)
+        self.action_space = spaces.MultiDiscrete([board_shape[1]] * num_envs)
+
+        self.__boards = np.zeros((num_envs,) + tuple(board_shape), dtype=np.int8)
+        self.__heights = np.zeros((num_envs, board_shape[1]), dtype=np.int8)
+        self.current_player = np.ones(num_envs, dtype=np.int8)
+        self.__index = np.arange(num_envs)
+
+    @property
+    def boards(self) -> np.ndarray:
+        return self.__boards.copy()
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Resets every game, or only the games where mask is True
+        """
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        self.__boards[mask] = 0
+        self.__heights[mask] = 0
+        self.current_player[mask] = 1
+        return self.boards
+
+    def available_moves(self) -> np.ndarray:
+        """
+        Returns a (num_envs, cols) bool array of the columns that are not full
+        """
+        return self.__heights < self.board_shape[0]
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+        rows, cols = self.board_shape
+        index = self.__index
+        actions = np.asarray(actions, dtype=np.intp)
+        player = self.current_player.copy()
+
+        heights = self.__heights[index, actions]
+        invalid = heights >= rows
+        valid = ~invalid
+        landing_rows = rows - 1 - heights.astype(np.intp)
+
+        self.__boards[index[valid], landing_rows[valid], actions[valid]] = player[valid]
+        self.__heights[index[valid], actions[valid]] += 1
+
+        # Same order of checks as ConnectFourEnv._step, a full board is a draw
+        draw = valid & (self.__heights == rows).all(axis=1)
+        win = valid & ~draw & self._is_win_at(landing_rows, actions, player)
+
+        rewards = np.full(self.num_envs, ConnectFourEnv.DEF_REWARD, dtype=np.float32)
+        rewards[draw] = ConnectFourEnv.DRAW_REWARD
+        rewards[win] = ConnectFourEnv.WIN_REWARD
+        rewards[invalid] = ConnectFourEnv.LOSS_REWARD
+        dones = invalid | draw | win
+
+        self.current_player = np.where(dones, player, -player).astype(np.int8)
+        info = {}
+        if self.auto_reset and dones.any():
+            info['final_observation'] = self.boards
+            self.reset(dones)
+        return self.boards, rewards, dones, info
+
+    def _is_win_at(self, rows: np.ndarray, cols: np.ndarray, player: np.ndarray) -> np.ndarray:
+        """
+        Checks the four lines through the disc just dropped in every game
+        """
+        height, width = self.board_shape
+        index = self.__index
+        win = np.zeros(self.num_envs, dtype=bool)
+        for d_row, d_col in ((1, 0), (0, 1), (1, 1), (1, -1)):
+            count = np.ones(self.num_envs, dtype=np.int8)
+            for sign in (1, -1):
+                connected = np.ones(self.num_envs, dtype=bool)
+                for k in range(1, 4):
+                    r = rows + sign * k * d_row
+                    c = cols + sign * k * d_col
+                    inside = (r >= 0) & (r < height) & (c >= 0) & (c < width)
+                    cells = self.__boards[index, np.clip(r, 0, height - 1), np.clip(c, 0, width - 1)]
+                    connected &= inside & (cells == player)
+                    count += connected
+            win |= count >= 4
+        return win
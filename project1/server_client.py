@@ -0,0 +1,256 @@
+"""
+Client of the course server, a local stand-in for it and a runner of concurrent server games
+
+ServerClient keeps one requests.Session, so every move reuses the same TLS
+connection instead of opening a new one. LocalServer answers /move and /stats
+the way the course server does with a random bot, for trying the client and
+the engine without playing counted games.
+
+The server keeps one running game per group of student ids, so games are run
+concurrently by giving one --stil-id group per worker, for example
+    python server_client.py --local -g 20 -i a-s,b-s -i c-s,d-s
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from gym_connect_four import ConnectFourEnv
+
+
+class ServerError(Exception):
+    """
+    Raised when the server answers with a bad status code or a bad status
+    """
+
+
+class ServerClient(object):
+    """
+    Description:
+        Client of the /move and /stats endpoints of the course server
+
+    Connections:
+        All requests go through one requests.Session whose pool keeps up to
+        pool_size connections to the server open between moves. Moves are never
+        retried, a repeated move could be played twice.
+    """
+
+    def __init__(self, address: str, stil_id: Sequence[str], api_key: str, pool_size: int = 1, timeout: float = 30.0):
+        self.address = address
+        self.stil_id = list(stil_id)
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def post(self, endpoint: str, data: dict) -> requests.Response:
+        data = dict(data, stil_id=self.stil_id, api_key=self.api_key)
+        return self.session.post(self.address + endpoint, data=data, timeout=self.timeout)
+
+    def move(self, move: int) -> requests.Response:
+        """
+        Sends a move, -1 starts a new game and counts any running game as a loss
+        """
+        res = self.post("move", {"move": move})
+        if res.status_code != 200:
+            raise ServerError("Server gave a bad response, error code={}".format(res.status_code))
+        if not res.json()['status']:
+            raise ServerError("Server returned a bad status. Return message: \n{}".format(res.json()['msg']))
+        return res
+
+    def stats(self) -> dict:
+        return self.post("stats", {}).json()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> 'ServerClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class LocalServer(object):
+    """
+    Description:
+        Stand-in for the course server on localhost, running in a background thread
+
+    Games:
+        One game per group of student ids, the student plays 1 and the random
+        bot plays -1. Results are from the view of the student: 1 win, 0.5 draw,
+        -1 loss, -10 for a move into a full column, and 0 while the game runs.
+    """
+
+    def __init__(self, port: int = 0, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.games: Dict[Tuple[str, ...], ConnectFourEnv] = {}
+        self.results: Dict[Tuple[str, ...], List[float]] = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                form = parse_qs(self.rfile.read(length).decode())
+                stil_id = tuple(form.get('stil_id', []))
+                with server.lock:
+                    if self.path.endswith('/move'):
+                        body = server.move(stil_id, int(form['move'][0]))
+                    elif self.path.endswith('/stats'):
+                        body = server.stats(stil_id)
+                    else:
+                        self.send_error(404)
+                        return
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def address(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return "http://{}:{}/".format(host, port)
+
+    def start(self) -> 'LocalServer':
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'LocalServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def bot_move(self, game: ConnectFourEnv) -> Tuple[int, float]:
+        """
+        Plays a random move for -1 and returns it with the result for the student
+        """
+        game.change_player()
+        botmove = self.rng.choice(sorted(game.available_moves()))
+        _, reward, done, _ = game.step(botmove)
+        game.change_player()
+        if not done:
+            return botmove, 0
+        return botmove, 0.5 if reward == ConnectFourEnv.DRAW_REWARD else -1
+
+    def finish(self, stil_id: Tuple[str, ...], result: float) -> None:
+        self.results.setdefault(stil_id, []).append(result)
+        del self.games[stil_id]
+
+    def move(self, stil_id: Tuple[str, ...], move: int) -> dict:
+        if not stil_id:
+            return {'status': False, 'msg': "No stil_id given"}
+        if move == -1:
+            if stil_id in self.games:
+                self.finish(stil_id, -1)
+            game = ConnectFourEnv()
+            self.games[stil_id] = game
+            botmove = -1
+            if self.rng.random() < 0.5:
+                botmove, _ = self.bot_move(game)
+                msg = "New game, the bot starts"
+            else:
+                msg = "New game, you start"
+            return {'status': True, 'msg': msg, 'botmove': botmove, 'result': 0, 'state': game.board.tolist()}
+
+        game = self.games.get(stil_id)
+        if game is None:
+            return {'status': False, 'msg': "No running game, start one with move -1"}
+        if not game.is_valid_action(move):
+            self.finish(stil_id, -10)
+            return {'status': True, 'msg': "Illegal move", 'botmove': -1, 'result': -10, 'state': game.board.tolist()}
+        _, reward, done, _ = game.step(move)
+        botmove, result = -1, 0
+        if done:
+            result = 0.5 if reward == ConnectFourEnv.DRAW_REWARD else 1
+        else:
+            botmove, result = self.bot_move(game)
+        state = game.board.tolist()
+        if result != 0:
+            self.finish(stil_id, result)
+        return {'status': True, 'msg': "Bot played {}".format(botmove), 'botmove': botmove, 'result': result, 'state': state}
+
+    def stats(self, stil_id: Tuple[str, ...]) -> dict:
+        results = self.results.get(stil_id, [])
+        return {
+            'status': True,
+            'games': len(results),
+            'wins': results.count(1),
+            'draws': results.count(0.5),
+            'losses': len(results) - results.count(1) - results.count(0.5),
+        }
+
+
+def play_games(address: str, stil_id: Sequence[str], api_key: str, games: int, agent_name: str = 'skeleton') -> List[float]:
+    """
+    Plays games in a row with one agent of game_driver.py for one group of student ids
+    """
+    import game_driver
+    agent = game_driver.load_agent(agent_name)
+    with ServerClient(address, stil_id, api_key) as client:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [game_driver.play_server_game(agent, client, verbose=False) for _ in range(games)]
+
+
+def play_concurrent_games(address: str, stil_ids: List[Sequence[str]], api_key: str, games: int,
+                          agent_name: str = 'skeleton') -> Dict[str, List[float]]:
+    """
+    Plays games for every group of student ids at the same time, one process
+    per group since the search keeps its state in module globals
+    """
+    with ProcessPoolExecutor(len(stil_ids)) as executor:
+        futures = [executor.submit(play_games, address, stil_id, api_key, games, agent_name) for stil_id in stil_ids]
+        return {','.join(stil_id): future.result() for stil_id, future in zip(stil_ids, futures)}
+
+
+def main():
+    import skeleton
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-a", "--address", help="Server address", default=skeleton.SERVER_ADDRESS)
+    parser.add_argument("-l", "--local", help="Play against a local stand-in server", action="store_true")
+    parser.add_argument("-i", "--stil-id", help="Comma separated student ids of one group, one game at a time per group", action="append")
+    parser.add_argument("-k", "--api-key", help="API key of the server", default=skeleton.API_KEY)
+    parser.add_argument("-g", "--games", help="Games per group", type=int, default=1)
+    parser.add_argument("-A", "--agent", help="Agent of game_driver.py that plays the games", default="skeleton")
+    args = parser.parse_args()
+
+    stil_ids = [spec.split(',') for spec in args.stil_id] if args.stil_id else [skeleton.STIL_ID]
+    with contextlib.ExitStack() as stack:
+        address = args.address
+        if args.local:
+            address = stack.enter_context(LocalServer()).address
+        results = play_concurrent_games(address, stil_ids, args.api_key, args.games, args.agent)
+        for group, scores in results.items():
+            print("{}: {} wins, {} draws, {} losses".format(
+                group, scores.count(1), scores.count(0.5), len(scores) - scores.count(1) - scores.count(0.5)))
+            with ServerClient(address, group.split(','), args.api_key) as client:
+                print(client.stats())
+
+
+if __name__ == "__main__":
+    main()
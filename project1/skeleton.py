@@ -1,128 +1,359 @@
-import random
 import gym
-import requests
 import numpy as np
 import argparse
 import sys
+import os
 from gym_connect_four import ConnectFourEnv
+from connect_four_search import Deadline, EvaluationCache, MIN_PLAYER_KEY, MoveOrderer, Ponderer, RootSplitter, ScoredEnv, SearchStats, SearchTimeout, TranspositionTable, WindowEvaluator, iterative_deepening
+from connect_four_search.book import OpeningBook
+from connect_four_search.solver import EndgameSolver
+from connect_four_search.threats import find_threats
+from server_client import LocalServer
+import game_driver
 from math import inf
-from copy import deepcopy
 import time
-env: ConnectFourEnv = gym.make("ConnectFour-v0")
+#the search only reads boards, so they are not copied for every node
+env: ConnectFourEnv = gym.make("ConnectFour-v0", readonly_observations=True)
 
 SERVER_ADDRESS = "https://vilde.cs.lth.se/edap01-4inarow/"
 API_KEY = 'nyckel'
 STIL_ID = ["so4816ko-s", "vi0713ba-s"] 
 BIG_NUMBER = -inf 
-def call_server(move):
-   res = requests.post(SERVER_ADDRESS + "move",
-                       data={
-                           "stil_id": STIL_ID,
-                           "move": move, # -1 signals the system to start a new game. any running game is counted as a loss
-                           "api_key": API_KEY,
-                       })
-   # For safety some respose checking is done here
-   if res.status_code != 200:
-      print("Server gave a bad response, error code={}".format(res.status_code))
-      exit()
-   if not res.json()['status']:
-      print("Server returned a bad status. Return message: ")
-      print(res.json()['msg'])
-      exit()
-   return res
-
-def check_stats():
-   res = requests.post(SERVER_ADDRESS + "stats",
-                       data={
-                           "stil_id": STIL_ID,
-                           "api_key": API_KEY,
-                       })
-
-   stats = res.json()
-   return stats
-
-"""
-You can make your code work against this simple random agent
-before playing against the server.
-It returns a move 0-6 or -1 if it could not make a move.
-To check your code for better performance, change this code to
-use your own algorithm for selecting actions too
-"""
-def opponents_move(env):
-   env.change_player() # change to oppoment
-   avmoves = env.available_moves()
-   if not avmoves:
-      env.change_player() # change back to student before returning
-      return -1
-
-   #so that the user can play against the agent
-   print(env.board)
-   action = int(input("Your move (between 0 and 6): ")) 
-   #action = random.choice(list(avmoves))
-
-   state, reward, done, _ = env.step(action)
-   if done:
-      if reward == 1: # reward is always in current players view
-         reward = -1
-   env.change_player() # change back to student before returning
-   return state, reward, done
-
-def student_move(env):
+
+def select_move(state, time_budget = None):
+   env.reset(board = state)
+   return student_move(env, time_budget)
+
+def ponder(state):
+   #called by game_driver.py with the board after the student's move while the opponent is thinking
+   position = ConnectFourEnv(readonly_observations = True)
+   position.reset(board = state)
+   start_pondering(position)
+
+def stop_pondering():
+   #called by game_driver.py when the game is over, the search of the opponent's time is not needed anymore
+   if PONDER is not None: PONDER.stop()
+
+def student_move(env, time_budget = None):
    """
    Implement your min-max alpha-beta pruning algorithm here.
    Give it whatever input arguments you think are necessary
    (and change where it is called).
    The function should return a move from 0-6
+   Searches 1, 2, 3... moves ahead until time_budget seconds (TIME_BUDGET by default)
+   have passed and plays the best move of the deepest search that finished
    """
+   best_action, stats = search_move(env, time_budget)
+   print("time for action: ", stats.elapsed, stats.source, "depth: ", stats.depth)
+   if stats.source == "search":
+      #effective branching factor of the deepest search, the better the move ordering the lower it is
+      print("nodes: ", stats.total_nodes, "branching factor: ", stats.branching_factor())
+      print("transposition table: ", stats.cache)
+      if EVAL_CACHE is not None: print("evaluation cache: ", stats.eval_cache)
+   if STATS_LOG is not None: stats.log(STATS_LOG)
+   return best_action 
+
+def search_move(env, time_budget = None):
+   #returns the move and the SearchStats of the search for it
+   global STATS, LAST_DEPTH
+   #the search of the opponent's time shares the globals, it is stopped before they are replaced
+   pondered = PONDER.result(env.state.hash) if PONDER is not None else None
+   STATS = SearchStats(MAX_DEPTH + 2)
+   #early positions are looked up in the opening book built by build_opening_book.py
+   if BOOK is not None:
+      book_action = BOOK.lookup(env.state)
+      if book_action is not None and env.is_valid_action(book_action):
+         return book_action, STATS.finish("book", book_action)
+   #wins, blocks and double threats are played without searching
+   if THREAT_CHECK:
+      threats = find_threats(env.state, 1)
+      forced_action = threats.forced_move
+      if forced_action is not None:
+         score = None
+         if threats.wins or (not threats.blocks and forced_action in threats.double_threats): score = ConnectFourEnv.WIN_REWARD
+         elif threats.lost: score = ConnectFourEnv.LOSS_REWARD
+         return forced_action, STATS.finish("threat", forced_action, score)
+   TABLE.new_search()
+   ORDERING.new_search()
+   if EVAL_CACHE is not None: EVAL_CACHE.new_search()
+   if time_budget is None: time_budget = TIME_BUDGET
+   #searching deeper than the number of empty cells gives the same result
+   empty_cells = env.state.rows * env.state.cols - env.state.moves
+   #close to the end the game is solved exactly instead of searched with the heuristic
+   if empty_cells <= ENDGAME_CELLS:
+      best_action, score = SOLVER.best_move(env.state, 1)
+      STATS.nodes[0] = SOLVER.nodes
+      return best_action, STATS.finish("endgame", best_action, score, empty_cells)
+   #the position was searched while the opponent was thinking, as deep as the previous move was searched
+   #it is played at once, otherwise the search goes on from the depth it reached
+   if pondered is not None and pondered[2] >= min(LAST_DEPTH, MAX_DEPTH, empty_cells):
+      best_action, best_score, depth = pondered
+      return best_action, STATS.finish("ponder", best_action, best_score, depth)
+   root = parallel_root_search if WORKERS else root_search
+   search_env = scored(env)
+   search = lambda depth, previous_action, deadline: root(search_env, depth, previous_action, deadline)
+   best_action, best_score, depth = iterative_deepening(search, time_budget, min(MAX_DEPTH, empty_cells), pondered)
+   LAST_DEPTH = depth
+   #the parallel search probes the tables of the workers, their counters are merged into STATS
+   if not WORKERS: STATS.cache = TABLE.stats()
+   if EVAL_CACHE is not None: STATS.eval_cache = EVAL_CACHE.stats()
+   return best_action, STATS.finish("search", best_action, best_score, depth)
+
+def root_search(env, max_depth, previous_action, deadline):
    #definition of adversarial_search from the lecture
+   global DEADLINE
+   DEADLINE = deadline
    start_time = time.time()
+   start_nodes = STATS.total_nodes
+   STATS.nodes[0] += 1
+   completed = False
    best_action = None
-   best_score = -inf   
-   for a in env.available_moves():
-      env_copy = deepcopy(env)
-      new_s = env_copy.step(a)
-      score = SCORE(new_s, env_copy, best_score)
-      if score > best_score:
-         best_score = score
-         best_action = a
-   print("time for action: ", time.time() - start_time)
-   return best_action 
-
-MAX_DEPTH = 4
+   best_score = -inf
+   try:
+      for a in root_moves(env, previous_action):
+         new_s = env.push(a)
+         try:
+            score = SCORE(new_s, env, best_score, max_depth)
+         finally:
+            env.pop()
+         if score > best_score:
+            best_score = score
+            best_action = a
+      completed = True
+   finally:
+      STATS.iteration(max_depth, STATS.total_nodes - start_nodes, time.time() - start_time, completed)
+   return best_action, best_score
+
+def root_moves(env, previous_action):
+   #the best move of the previous iteration is searched first, it is most likely still the best
+   moves = env.available_moves()
+   #moves that let the opponent win on the cell right above them are only searched if all moves do
+   if THREAT_CHECK:
+      moves = find_threats(env.state, 1).safe or moves
+   moves = ORDERING.order(moves, 0, 0, previous_action)
+   #on a symmetric board a move and its mirror image are equally good, only the left one is searched
+   if env.state.is_symmetric():
+      moves = [a for a in moves if a <= env.state.mirror_move(a)]
+   return moves
+
+def parallel_root_search(env, max_depth, previous_action, deadline):
+   #the root moves are searched by WORKERS processes at the same time, same move as root_search
+   global PARALLEL
+   if PARALLEL is None: PARALLEL = RootSplitter(WORKERS)
+   start_time = time.time()
+   start_nodes = STATS.total_nodes
+   STATS.nodes[0] += 1
+   completed = False
+   try:
+      #the counters of the workers are merged into STATS
+      result = PARALLEL.search(score_root_move, env.board, root_moves(env, previous_action), max_depth, deadline, STATS)
+      completed = True
+   finally:
+      STATS.iteration(max_depth, STATS.total_nodes - start_nodes, time.time() - start_time, completed)
+   return result
+
+def start_pondering(env, action = None):
+   #searches the replies of the opponent to the position after action, or to env when the move is already made,
+   #on the opponent's time. the transposition table is shared, so the next search_move starts from a warm table.
+   #the workers of -w have their own tables that pondering does not reach, as a worker cannot be stopped
+   #when the opponent answers, so with WORKERS a pondered result is only used as the move or the depth to go on from
+   global STATS
+   if PONDER is None: return
+   PONDER.stop()
+   after = ConnectFourEnv(readonly_observations = True)
+   after.reset(board = env.board)
+   if action is not None and after.push(action)[1]: return
+   #the endgame solver needs no warm table
+   if after.state.rows * after.state.cols - after.state.moves <= ENDGAME_CELLS + 1: return
+   after.change_player()
+   positions = []
+   for reply in after.available_moves():
+      reward, done = after.push(reply)
+      if not done:
+         position = ConnectFourEnv(readonly_observations = True)
+         position.reset(board = after.board)
+         empty_cells = position.state.rows * position.state.cols - position.state.moves
+         positions.append((position.state.hash, scored(position), min(MAX_DEPTH, empty_cells)))
+      after.pop()
+   if not positions: return
+   #the reply that is worst for the student is the most likely one
+   scores = eval_batch(np.array([position.board for _, position, _ in positions]))
+   positions = [positions[i] for i in np.argsort(scores, kind = "stable")]
+   STATS = SearchStats(MAX_DEPTH + 2)
+   TABLE.new_search()
+   PONDER.start(positions)
+
+def score_root_move(board, a, max_depth, alpha, deadline):
+   #runs in a worker process, with its own env, transposition table, move ordering and STATS,
+   #which are returned with the score, or with the timeout when the search runs out of time
+   global DEADLINE, STATS
+   DEADLINE = deadline
+   STATS = SearchStats(max_depth + 2)
+   #the table of the worker is kept between root moves, only the counters of this move are returned
+   start_cache = TABLE.stats()
+   env.reset(board=board)
+   env_c = scored(env)
+   try:
+      return SCORE(env_c.push(a), env_c, alpha, max_depth), STATS
+   except SearchTimeout as timeout:
+      timeout.stats = STATS
+      raise
+   finally:
+      STATS.cache = {key: value - start_cache[key] for key, value in TABLE.stats().items() if key != 'hit_rate'}
+
+#seconds student_move may spend on a move, it stops at MAX_DEPTH (the longest a game can go on) otherwise
+TIME_BUDGET = 1.0
+#processes searching the root moves, 0 searches them one after the other in this process
+WORKERS = 0
+PARALLEL = None
+MAX_DEPTH = 42
+#set by root_search, checked in every node so that an unfinished iteration is abandoned in time
+DEADLINE = Deadline()
+#killer moves and history scores, the history is kept between moves
+ORDERING = MoveOrderer(max_ply = MAX_DEPTH + 1)
+#counters of the search for the current move, returned by search_move
+STATS = SearchStats()
+#file student_move appends the statistics of every move to as JSON lines, not logged when None
+STATS_LOG = None
+#kept between moves, positions searched for the previous move are often reached again
+TABLE = TranspositionTable()
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+BOOK = OpeningBook(BOOK_PATH) if os.path.exists(BOOK_PATH) else None
+#immediate wins and threats are looked for with bitboard masks before searching
+THREAT_CHECK = True
+#empty cells from which student_move plays perfectly with the endgame solver
+ENDGAME_CELLS = 16
+SOLVER = EndgameSolver()
+#searches the replies of the opponent while waiting for them, None when pondering is off
+PONDER = None
+#depth the last search_move reached, a pondered reply searched as deep is played without searching
+LAST_DEPTH = MAX_DEPTH
 
 #using the minimax algorithm implementation from the lecture notes, with the alpha beta pruning
-#doing deep copies at every step to preserve the real state of the board
-def SCORE(state, env_c, alpha):
-   return min_player(state, env_c, alpha, inf, depth = 1)
-
-def min_player(state, env_c, alpha, beta, depth = 1):
+#moves are made with push and taken back with pop, so the real board is restored after every child
+def SCORE(state, env_c, alpha, max_depth = MAX_DEPTH):
+   return min_player(state, env_c, alpha, inf, depth = 1, max_depth = max_depth)
+
+def tt_move(env_c, move, mirrored):
+   #the table holds the canonical orientation of a position, moves are mirrored in and out of it
+   if move is None or not mirrored: return move
+   return env_c.state.mirror_move(move)
+
+def frontier_scores(env_c, moves, depth):
+   #the children of a node just above max_depth are only evaluated, so their boards are
+   #stacked and scored with one eval_batch call instead of one eval call per child
+   STATS.nodes[depth] += len(moves)
+   if isinstance(env_c, ScoredEnv): return scored_children(env_c, moves)
+   scores = [None] * len(moves)
+   leaves = []
+   boards = []
+   for i, a in enumerate(moves):
+      reward, done = env_c.push(a)
+      if done: scores[i] = reward
+      else:
+         key = env_c.state.canonical_hash()[0]
+         score = EVAL_CACHE.get(key) if EVAL_CACHE is not None else None
+         if score is not None: scores[i] = score
+         else:
+            leaves.append((i, key))
+            boards.append(env_c.board)
+      env_c.pop()
+   if boards:
+      for (i, key), score in zip(leaves, eval_batch(np.array(boards))):
+         scores[i] = int(score)
+         if EVAL_CACHE is not None: EVAL_CACHE.put(key, scores[i])
+   return scores
+
+def scored_children(env_c, moves):
+   #a ScoredEnv updates its score on push, so every child is scored by reading it
+   STATS.evaluations += len(moves)
+   scores = []
+   for a in moves:
+      reward, done = env_c.push(a)
+      scores.append(reward if done else env_c.score)
+      env_c.pop()
+   return scores
+
+def min_player(state, env_c, alpha, beta, depth = 1, max_depth = MAX_DEPTH):
+   STATS.nodes[depth] += 1
    env_c.change_player()
-   done = state[2] #done return value in step
-   if done: return state[1] #reward return value in step
+   reward, done = state #return values of push
+   if done: return reward
+
+   elif depth == max_depth: return eval(env_c) 
 
-   elif depth == MAX_DEPTH: return eval(env_c) 
+   DEADLINE.check()
+
+   #positions reached through a different move order, or their mirror image, are looked up instead of searched again
+   key, mirrored = env_c.state.canonical_hash()
+   key ^= MIN_PLAYER_KEY
+   entry = TABLE.probe(key)
+   if entry is not None:
+      value = TABLE.cutoff(entry, max_depth - depth, alpha, beta)
+      if value is not None: return value
 
    best_score = inf
-   for a in env_c.available_moves():
-      env_copy = deepcopy(env_c)
-      best_score = min(best_score, max_player(env_copy.step(a), env_copy, alpha, beta, depth = depth + 1))
-      if best_score <= alpha: break
+   best_action = None
+   moves = ORDERING.order(env_c.available_moves(), depth, 1, tt_move(env_c, None if entry is None else entry.move, mirrored))
+   scores = frontier_scores(env_c, moves, depth + 1) if depth + 1 == max_depth else None
+   for i, a in enumerate(moves):
+      if scores is not None: score = scores[i]
+      else:
+         try:
+            score = max_player(env_c.push(a), env_c, alpha, beta, depth = depth + 1, max_depth = max_depth)
+         finally:
+            env_c.pop()
+      if score < best_score:
+         best_score = score
+         best_action = a
+      if best_score <= alpha:
+         STATS.cutoff(i == 0)
+         ORDERING.cutoff(a, depth, max_depth - depth, 1)
+         break
+   else:
+      ORDERING.best(best_action, max_depth - depth, 1)
+   TABLE.store(key, max_depth - depth, best_score, TABLE.bound(best_score, alpha, beta), tt_move(env_c, best_action, mirrored))
    return best_score
 
-def max_player(state, env_c, alpha, beta, depth = 1):
+def max_player(state, env_c, alpha, beta, depth = 1, max_depth = MAX_DEPTH):
+   STATS.nodes[depth] += 1
    env_c.change_player()
-   done = state[2]
-   if done: return state[1]
+   reward, done = state
+   if done: return reward
+
+   elif depth == max_depth: return eval(env_c) 
+
+   DEADLINE.check()
 
-   elif depth == MAX_DEPTH: return eval(env_c) 
+   key, mirrored = env_c.state.canonical_hash()
+   entry = TABLE.probe(key)
+   if entry is not None:
+      value = TABLE.cutoff(entry, max_depth - depth, alpha, beta)
+      if value is not None: return value
 
-   
+   alpha_start = alpha
    best_score = -inf
-   for a in env_c.available_moves():
-      env_copy = deepcopy(env_c)
-      best_score = max(best_score, min_player(env_copy.step(a), env_copy, alpha, beta, depth = depth + 1)) 
+   best_action = None
+   moves = ORDERING.order(env_c.available_moves(), depth, 0, tt_move(env_c, None if entry is None else entry.move, mirrored))
+   scores = frontier_scores(env_c, moves, depth + 1) if depth + 1 == max_depth else None
+   for i, a in enumerate(moves):
+      if scores is not None: score = scores[i]
+      else:
+         try:
+            score = min_player(env_c.push(a), env_c, alpha, beta, depth = depth + 1, max_depth = max_depth)
+         finally:
+            env_c.pop()
+      if score > best_score:
+         best_score = score
+         best_action = a
       alpha = max(alpha, best_score)
-      if best_score >= beta: break
+      if best_score >= beta:
+         STATS.cutoff(i == 0)
+         ORDERING.cutoff(a, depth, max_depth - depth, 0)
+         break
+   else:
+      ORDERING.best(best_action, max_depth - depth, 0)
+   TABLE.store(key, max_depth - depth, best_score, TABLE.bound(best_score, alpha_start, beta), tt_move(env_c, best_action, mirrored))
    return best_score
 
 def evaluate_score(block):
@@ -148,154 +379,76 @@ def evaluate_score(block):
     
 SHAPE_0 = 6
 SHAPE_1 = 7
+#every row, column and diagonal window of four cells is scored with evaluate_score in one numpy pass
+EVALUATOR = WindowEvaluator(evaluate_score, SHAPE_0, SHAPE_1)
+#if i have the middle row, it's good (allows more combinations)
+CELL_WEIGHTS = np.zeros((SHAPE_0, SHAPE_1), dtype=np.int64)
+CELL_WEIGHTS[5, 3] = 2
+#the search keeps the score of its board up to date on every move instead of rescoring leaves,
+#False scores every leaf with eval_batch and the evaluation cache
+INCREMENTAL = True
+#scores of the boards evaluated so far, kept between moves, None evaluates every board.
+#the incremental search never looks leaves up, so it has no cache
+EVAL_CACHE_SIZE = 1 << 18
+EVAL_CACHE = None if INCREMENTAL else EvaluationCache(EVAL_CACHE_SIZE)
+
 def eval(env_c):
-   score = 0
-   env_copy = deepcopy(env_c)
-   board = env_copy.board
-
-	#for each row, column and diagonal, check if there are some discs aligned
-
-   for row in range(SHAPE_0):
-      row_array = np.array(board[row])
-      for spot in range(4):
-         block = np.array([row_array[spot + i] for i in range(4)])
-         score += evaluate_score(block)
-
-	#columns
-   for col in range(SHAPE_1):
-      col_array = np.array([board[row][col] for row in range(SHAPE_0 - 1, -1, -1)])
-
-      for spot in range(3):
-         block = np.array([col_array[spot + i] for i in range(4)])
-         score += evaluate_score(block)
-
-	#diagonals
-   for row in range(3):
-      for col in range(4):
-         diag_array = np.array([board[5-row-i][col+i] for i in range(4)])
-         score += evaluate_score(diag_array)
-   
-   for row in range(3):
-      for col in range(4):
-       four = np.array([board[row+i][col+i] for i in range(4)])
-       score += evaluate_score(four)
-
-   #if i have the middle row, it's good (allows more combinations)
-   if board[5][3] == 1: score += 2
-   if board[5][3] == -1: score += -2
+   if isinstance(env_c, ScoredEnv):
+      STATS.evaluations += 1
+      return env_c.score
+   if EVAL_CACHE is None: return int(eval_batch(env_c.board[np.newaxis])[0])
+   #the heuristic scores a board and its mirror image the same, so the canonical hash is the key
+   key = env_c.state.canonical_hash()[0]
+   score = EVAL_CACHE.get(key)
+   if score is None:
+      score = int(eval_batch(env_c.board[np.newaxis])[0])
+      EVAL_CACHE.put(key, score)
    return score
 
+def eval_batch(boards):
+   #scores a stack of boards of shape (N, 6, 7) at once, with the same values as eval
+   STATS.evaluations += len(boards)
+   score = EVALUATOR.evaluate_batch(boards)
+   return score + boards.reshape(len(boards), -1) @ CELL_WEIGHTS.ravel()
 
-def play_game(vs_server = False):
-   """
-   The reward for a game is as follows. You get a
-   botaction = random.choice(list(avmoves)) reward from the
-   server after each move, but it is 0 while the game is running
-   loss = -1
-   win = +1
-   draw = +0.5
-   error = -10 (you get this if you try to play in a full column)
-   Currently the player always makes the first move
-   """
-
-   # default state
-   state = np.zeros((6, 7), dtype=int)
+def scored(env_c):
+   #wraps env_c so that push and pop keep its score up to date, eval is then a field read
+   if not INCREMENTAL: return env_c
+   return ScoredEnv(env_c, EVALUATOR, CELL_WEIGHTS)
 
-   # setup new game
-   if vs_server:
-      # Start a new game
-      res = call_server(-1) # -1 signals the system to start a new game. any running game is counted as a loss
 
-      # This should tell you if you or the bot starts
-      print(res.json()['msg'])
-      botmove = res.json()['botmove']
-      state = np.array(res.json()['state'])
-      # reset env to state from the server (if you want to use it to keep track)
-      env.reset(board=state)
-   else:
-      # reset game to starting state
-      env.reset(board=None)
-      # determine first player
-      student_gets_move = random.choice([True, False])
-      if student_gets_move:
-         print('Bot (agent) start!')
-         print()
-      else:
-         print('You (user) start!')
-         print()
-
-   # Print current gamestate
-   print("Current state (1 are student discs, -1 are servers, 0 is empty): ")
-   print(state)
-   print()
-
-   done = False
-   while not done:
-      # Select your move
-      stmove = student_move(env) 
-
-      # make both student and bot/server moves
-      if vs_server:
-         # Send your move to server and get response
-         res = call_server(stmove)
-         print(res.json()['msg'])
-
-         # Extract response values
-         result = res.json()['result']
-         botmove = res.json()['botmove']
-         state = np.array(res.json()['state'])
-         # reset env to state from the server (if you want to use it to keep track)
-         env.reset(board=state)
-      else:
-         if student_gets_move:
-            # Execute your move
-            avmoves = env.available_moves()
-            if stmove not in avmoves:
-               print("You tried to make an illegal move! You have lost the game.")
-               break
-            state, result, done, _ = env.step(stmove)
-
-         student_gets_move = True # student only skips move first turn if bot starts
-
-         # print or render state here if you like
-
-         # select and make a move for the opponent, returned reward from students view
-         if not done:
-            state, result, done = opponents_move(env)
-
-      # Check if the game is over
-      if result != 0:
-         done = True
-         if not vs_server:
-            print("Game over. ", end="")
-         if result == 1:
-            print("You (bot) won!")
-         elif result == 0.5:
-            print("It's a draw!")
-         elif result == -1:
-            print("You (bot) lost!")
-         elif result == -10:
-            print("You (bot) made an illegal move and have lost!")
-         else:
-            print("Unexpected result result={}".format(result))
-         if not vs_server:
-            print("Final state (1 are student discs, -1 are servers, 0 is empty): ")
-      else:
-         print("Current state (1 are student discs, -1 are servers, 0 is empty): ")
-
-      # Print current gamestate
-      print(state)
-      print()
+def play_game(vs_server = False):
+   #locally the user plays against the agent
+   game_driver.play_game(sys.modules[__name__], vs_server, opponent = game_driver.HumanAgent())
 
 def main():
+   global WORKERS, STATS_LOG, SERVER_ADDRESS, PONDER, INCREMENTAL, EVAL_CACHE
    # Parse command line arguments
    parser = argparse.ArgumentParser()
    group = parser.add_mutually_exclusive_group()
    group.add_argument("-l", "--local", help = "Play locally", action="store_true")
    group.add_argument("-o", "--online", help = "Play online vs server", action="store_true")
    parser.add_argument("-s", "--stats", help = "Show your current online stats", action="store_true")
+   parser.add_argument("-w", "--workers", help = "Search the root moves in this many processes", type=int, default=0)
+   parser.add_argument("--stats-log", help = "Append the search statistics of every move to this file as JSON lines")
+   parser.add_argument("-a", "--address", help = "Play online vs the server at this address", default = SERVER_ADDRESS)
+   parser.add_argument("-n", "--no-incremental", help = "Score every leaf from scratch instead of updating the score on every move", action="store_true")
+   parser.add_argument("--eval-cache", help = "Boards the evaluation cache of --no-incremental holds, 0 turns it off", type=int)
+   parser.add_argument("-p", "--ponder", help = "Search the replies of the opponent while waiting for its move, in this process also with -w", action="store_true")
+   parser.add_argument("--stand-in", help = "Play online vs a local stand-in of the server with a random bot", action="store_true")
    args = parser.parse_args()
 
+   WORKERS = args.workers
+   STATS_LOG = args.stats_log
+   if args.ponder: PONDER = Ponderer(root_search)
+   if args.eval_cache is not None and not args.no_incremental: parser.error("--eval-cache needs --no-incremental")
+   INCREMENTAL = not args.no_incremental
+   if args.eval_cache is None: args.eval_cache = EVAL_CACHE_SIZE
+   EVAL_CACHE = EvaluationCache(args.eval_cache) if args.eval_cache > 0 and not INCREMENTAL else None
+   if args.stand_in:
+      args.address = LocalServer().start().address
+   SERVER_ADDRESS = args.address
+
    # Print usage info if no arguments are given
    if len(sys.argv)==1:
       parser.print_help(sys.stderr)
@@ -307,7 +460,7 @@ def main():
       play_game(vs_server = True)
 
    if args.stats:
-      stats = check_stats()
+      stats = game_driver.check_stats(sys.modules[__name__])
       print(stats)
 
    # TODO: Run program with "--online" when you are ready to play against the server
@@ -1,78 +1,30 @@
 import gym
-import random
-import requests
 import numpy as np
 import argparse
 import sys
 import math
-import copy
 from gym_connect_four import ConnectFourEnv
+from connect_four_search import EvaluationCache, MoveOrderer
+import game_driver
 
 env: ConnectFourEnv = gym.make("ConnectFour-v0")
+# killer moves and history scores used to order the moves in min_max, indexed by the remaining depth
+ORDERING = MoveOrderer()
+NODES = 0
+# scores of the boards evaluated so far, kept between moves, None evaluates every board
+EVAL_CACHE = EvaluationCache()
 
 SERVER_ADDRESS = "https://vilde.cs.lth.se/edap01-4inarow/"
 API_KEY = 'nyckel'
 STIL_ID = ["vi07313ba-s", "so4816ko-s"]  # fill this list with your stil-id's
 
 
-def call_server(move):
-    res = requests.post(SERVER_ADDRESS + "move",
-                        data={
-                            "stil_id": STIL_ID,
-                            "move": move,
-                            # -1 signals the system to start a new game. any running game is counted as a loss
-                            "api_key": API_KEY,
-                        })
-    # For safety some respose checking is done here
-    if res.status_code != 200:
-        print("Server gave a bad response, error code={}".format(res.status_code))
-        exit()
-    if not res.json()['status']:
-        print("Server returned a bad status. Return message: ")
-        print(res.json()['msg'])
-        exit()
-    return res
-
-
-def check_stats():
-    res = requests.post(SERVER_ADDRESS + "stats",
-                        data={
-                            "stil_id": STIL_ID,
-                            "api_key": API_KEY,
-                        })
-
-    stats = res.json()
-    return stats
-
-
-"""
-You can make your code work against this simple random agent
-before playing against the server.
-It returns a move 0-6 or -1 if it could not make a move.
-To check your code for better performance, change this code to
-use your own algorithm for selecting actions too
-"""
-
-
-def opponents_move(env):
-    env.change_player()  # change to oppoent
-    avmoves = env.available_moves()
-    if not avmoves:
-        env.change_player()  # change back to student before returning
-        return -1
-
-    # TODO: Optional? change this to select actions with your policy too
-    # that way you get way more interesting games, and you can see if starting
-    # is enough to guarrantee a win
-    action = random.choice(list(avmoves))
-    # action = input("Give a move: ", avmoves)
-
-    state, reward, done, _ = env.step(action)
-    if done:
-        if reward == 1:  # reward is always in current players view
-            reward = -1
-    env.change_player()  # change back to student before returning
-    return state, reward, done
+def select_move(state, time_budget=None):
+    """
+    min_max searches to a fixed depth, so time_budget is not used
+    """
+    env.reset(board=state)
+    return student_move()
 
 
 def evaluate_block(block):
@@ -148,6 +100,22 @@ def score_token_position(state, token):
     return score
 
 
+def evaluate(env):
+    """
+    score_token_position of the board of env, looked up in EVAL_CACHE first
+
+    The score is the same for a board and its mirror image, so the canonical hash is the key
+    """
+    if EVAL_CACHE is None:
+        return score_token_position(env.board, True)
+    key = env.state.canonical_hash()[0]
+    score = EVAL_CACHE.get(key)
+    if score is None:
+        score = score_token_position(env.board, True)
+        EVAL_CACHE.put(key, score)
+    return score
+
+
 def student_move():
     """
     TODO: Implement your min-max alpha-beta pruning algorithm here.
@@ -155,7 +123,16 @@ def student_move():
     (and change where it is called).
     The function should return a move from 0-6
     """
+    global NODES
+    NODES = 0
+    ORDERING.new_search()
+    if EVAL_CACHE is not None:
+        EVAL_CACHE.new_search()
     best_move, value = min_max(env, 5, -math.inf, math.inf, True)
+    # effective branching factor, the better the move ordering the lower it is
+    print("nodes: ", NODES, "branching factor: ", NODES ** (1 / 5))
+    if EVAL_CACHE is not None:
+        print("evaluation cache: ", EVAL_CACHE.stats())
     return best_move
 
 
@@ -167,163 +144,79 @@ def min_max(env, depth, alpha, beta, max_player):
     max_player: flag that represents if its players turn
     env: current state of the game
     """
+    global NODES
+    NODES += 1
     player_moves = env.available_moves()
 
     # terminal node: opponent wins, player wins, or no more pieces
     if depth == 0 or len(player_moves) == 0 or env.is_win_state():
-        return None, score_token_position(env.board, True)
+        return None, evaluate(env)
 
-    random.shuffle(list(player_moves))
+    # killer moves and the history first, then the center columns
+    player_moves = ORDERING.order(player_moves, depth, 0 if max_player else 1)
 
     if max_player:
         max_value = -math.inf
         # Use center column as default
         best_move = 3
         for move in player_moves:
-            new_env = copy.deepcopy(env)
-            new_env.step(move)
-            new_env.change_player()
+            env.push(move)
+            env.change_player()
 
             # no need for the move that will be returned with this function call as its not needed hence
             # why it is set to a temp variable
-            _, value = min_max(new_env, depth - 1, alpha, beta, False)
+            _, value = min_max(env, depth - 1, alpha, beta, False)
+            # take the move back, this also restores the player that made it
+            env.pop()
             if max_value < value:
                 max_value = value
                 best_move = move
             alpha = max(alpha, value)
             if beta <= alpha:
+                ORDERING.cutoff(move, depth, depth, 0)
                 break
+        else:
+            ORDERING.best(best_move, depth, 0)
         return best_move, max_value
     else:
         min_value = math.inf
         best_move = 3
         for move in player_moves:
-            new_env = copy.deepcopy(env)
-            new_env.step(move)
-            new_env.change_player()
+            env.push(move)
+            env.change_player()
 
-            _, value = min_max(new_env, depth - 1, alpha, beta, True)
+            _, value = min_max(env, depth - 1, alpha, beta, True)
+            env.pop()
             if min_value > value:
                 min_value = value
                 best_move = move
             beta = min(beta, value)
             if beta <= alpha:
+                ORDERING.cutoff(move, depth, depth, 1)
                 break
+        else:
+            ORDERING.best(best_move, depth, 1)
         return best_move, min_value
 
 
 def play_game(vs_server=False):
-    """
-   The reward for a game is as follows. You get a
-   botaction = random.choice(list(avmoves)) reward from the
-   server after each move, but it is 0 while the game is running
-   loss = -1
-   win = +1
-   draw = +0.5
-   error = -10 (you get this if you try to play in a full column)
-   Currently the player always makes the first move
-   """
-
-    # default state
-    state = np.zeros((6, 7), dtype=int)
-
-    # setup new game
-    if vs_server:
-        # Start a new game
-        res = call_server(-1)  # -1 signals the system to start a new game. any running game is counted as a loss
-
-        # This should tell you if you or the bot starts
-        print(res.json()['msg'])
-        botmove = res.json()['botmove']
-        state = np.array(res.json()['state'])
-        # reset env to state from the server (if you want to use it to keep track)
-        env.reset(board=state)
-    else:
-        # reset game to starting state
-        env.reset(board=None)
-        # determine first player
-        student_gets_move = random.choice([True, False])
-        if student_gets_move:
-            print('You start!')
-            print()
-        else:
-            print('Bot starts!')
-            print()
-
-    # Print current gamestate
-    print("Current state (1 are student discs, -1 are servers, 0 is empty): ")
-    print(state)
-    print()
-
-    done = False
-    while not done:
-        # Select your move
-        # Pass
-        stmove = student_move()
-
-        # make both student and bot/server moves
-        if vs_server:
-            # Send your move to server and get response
-            res = call_server(stmove)
-            print(res.json()['msg'])
-
-            # Extract response values
-            result = res.json()['result']
-            botmove = res.json()['botmove']
-            state = np.array(res.json()['state'])
-            # reset env to state from the server (if you want to use it to keep track)
-            env.reset(board=state)
-        else:
-            if student_gets_move:
-                # Execute your move
-                avmoves = env.available_moves()
-                if stmove not in avmoves:
-                    print("You tied to make an illegal move! You have lost the game.")
-                    break
-                state, result, done, _ = env.step(stmove)
-
-            student_gets_move = True  # student only skips move first turn if bot starts
-
-            # print or render state here if you like
-
-            # select and make a move for the opponent, returned reward from students view
-            if not done:
-                state, result, done = opponents_move(env)
-
-        # Check if the game is over
-        if result != 0:
-            done = True
-            if not vs_server:
-                print("Game over. ", end="")
-            if result == 1:
-                print("You won!")
-            elif result == 0.5:
-                print("It's a draw!")
-            elif result == -1:
-                print("You lost!")
-            elif result == -10:
-                print("You made an illegal move and have lost!")
-            else:
-                print("Unexpected result result={}".format(result))
-            if not vs_server:
-                print("Final state (1 are student discs, -1 are servers, 0 is empty): ")
-        else:
-            print("Current state (1 are student discs, -1 are servers, 0 is empty): ")
-
-        # Print current gamestate
-        print(state)
-        print()
+    game_driver.play_game(sys.modules[__name__], vs_server)
 
 
 def main():
+    global EVAL_CACHE
     # Parse command line arguments
     parser = argparse.ArgumentParser()
     group = parser.add_mutually_exclusive_group()
     group.add_argument("-l", "--local", help="Play locally", action="store_true")
     group.add_argument("-o", "--online", help="Play online vs server", action="store_true")
     parser.add_argument("-s", "--stats", help="Show your current online stats", action="store_true")
+    parser.add_argument("--eval-cache", help="Boards the evaluation cache holds, 0 turns it off", type=int,
+                        default=EVAL_CACHE.capacity)
     args = parser.parse_args()
 
+    EVAL_CACHE = EvaluationCache(args.eval_cache) if args.eval_cache > 0 else None
+
     # Print usage info if no arguments are given
     if len(sys.argv) == 1:
         parser.print_help(sys.stderr)
@@ -335,7 +228,7 @@ def main():
         play_game(vs_server=True)
 
     if args.stats:
-        stats = check_stats()
+        stats = game_driver.check_stats(sys.modules[__name__])
         print(stats)
 
     # TODO: Run program with "--online" when you are ready to play against the server
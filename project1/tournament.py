@@ -0,0 +1,245 @@
+"""
+Headless self-play tournament between search configurations of skeleton.py
+
+Every pair of configurations plays --games games in a process pool, half of
+them with each side starting. The first --random-plies moves of every game are
+random so that the deterministic engines do not replay the same game. Results,
+Elo ratings, games per second and per-move latency percentiles are written to
+--output as JSON.
+
+Configurations are given as name:key=value,key=value, for example
+    python tournament.py -c d4:depth=4 -c d6:depth=6 -c d6-plain:depth=6,ordering=0
+Keys: depth (deepest iteration), time (seconds per move), ordering (0 or 1),
+evaluator (skeleton or vivian), endgame (empty cells for the exact solver),
+threats (0 or 1, play forced moves without searching), incremental (0 or 1, 0
+scores every leaf with the evaluation cache), engine (minimax or mcts),
+and for mcts iterations (playouts per move, 0 for only the time limit) and
+rollout (random or heuristic), for example
+    python tournament.py -c ab:depth=6,time=0.5 -c mcts:engine=mcts,time=0.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import inf
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+from connect_four_search import EvaluationCache, MCTS, MoveOrderer, TranspositionTable, WindowEvaluator
+from gym_connect_four import ConnectFourEnv
+import skeleton
+
+
+class PlayerConfig(NamedTuple):
+    name: str
+    depth: int = 4
+    time: float = inf
+    ordering: bool = True
+    evaluator: str = 'skeleton'
+    endgame: int = 0
+    threats: bool = True
+    incremental: bool = True
+    engine: str = 'minimax'
+    iterations: int = 0
+    rollout: str = 'heuristic'
+
+
+class UnorderedMoves(MoveOrderer):
+    """
+    Keeps moves in the order available_moves returns them, for configurations without move ordering
+    """
+
+    def order(self, moves, ply, side=0, best_move=None):
+        return list(moves)
+
+    def best(self, move, depth, side=0):
+        pass
+
+    def cutoff(self, move, ply, depth, side=0):
+        pass
+
+
+def parse_config(spec: str) -> PlayerConfig:
+    name, _, options = spec.partition(':')
+    config = PlayerConfig(name)
+    for option in filter(None, options.split(',')):
+        key, value = option.split('=')
+        field_type = type(getattr(config, key))
+        if field_type is bool:
+            value = value not in ('0', 'false', 'False')
+        config = config._replace(**{key: field_type(value)})
+    return config
+
+
+def window_score(evaluator: str):
+    if evaluator == 'vivian':
+        import skeleton_vivian
+        return skeleton_vivian.evaluate_block
+    return skeleton.evaluate_score
+
+
+class Player(object):
+    """
+    A configuration together with the search state it keeps between its moves
+    """
+
+    def __init__(self, config: PlayerConfig):
+        self.config = config
+        self.table = TranspositionTable(1 << 16)
+        self.ordering = MoveOrderer(max_ply=skeleton.SHAPE_0 * skeleton.SHAPE_1 + 1) if config.ordering else UnorderedMoves()
+        self.evaluator = WindowEvaluator(window_score(config.evaluator), skeleton.SHAPE_0, skeleton.SHAPE_1)
+        # Only leaves scored from scratch go through the cache
+        self.eval_cache = None if config.incremental else EvaluationCache(1 << 16)
+        self.mcts = MCTS(rollout=config.rollout) if config.engine == 'mcts' else None
+
+    def move(self, env: ConnectFourEnv, board: np.ndarray) -> int:
+        # skeleton searches for player 1, so the player to move always sees its own discs as 1
+        env.reset(board=board)
+        if self.mcts is not None:
+            # Without any limit MCTS plays 1000 playouts per move
+            iterations = self.config.iterations or (1000 if self.config.time == inf else 0)
+            move, _ = self.mcts.best_move(env.state, 1, self.config.time, iterations)
+            return move
+        skeleton.TABLE = self.table
+        skeleton.ORDERING = self.ordering
+        skeleton.EVALUATOR = self.evaluator
+        skeleton.INCREMENTAL = self.config.incremental
+        skeleton.EVAL_CACHE = self.eval_cache
+        skeleton.MAX_DEPTH = self.config.depth
+        skeleton.ENDGAME_CELLS = self.config.endgame
+        skeleton.THREAT_CHECK = self.config.threats
+        with contextlib.redirect_stdout(io.StringIO()):
+            return skeleton.student_move(env, self.config.time)
+
+
+def play_game(first: PlayerConfig, second: PlayerConfig, random_plies: int, seed: int) -> Tuple[float, Dict[str, List[float]]]:
+    """
+    Plays one game and returns the score of first (1, 0.5 or 0) and the move latencies of both configurations
+    """
+    skeleton.BOOK = None
+    rng = random.Random(seed)
+    players = {1: Player(first), -1: Player(second)}
+    latencies = {first.name: [], second.name: []}
+    game = ConnectFourEnv()
+    search_env = ConnectFourEnv()
+    player = 1
+    while True:
+        if game.state.moves < random_plies:
+            action = rng.choice(sorted(game.available_moves()))
+        else:
+            start_time = time.perf_counter()
+            action = players[player].move(search_env, game.board * player)
+            latencies[players[player].config.name].append(time.perf_counter() - start_time)
+        _, reward, done, _ = game.step(action)
+        if done:
+            # reward is from the view of the player that moved
+            if reward == ConnectFourEnv.DRAW_REWARD:
+                return 0.5, latencies
+            return (1.0 if player == 1 else 0.0), latencies
+        game.change_player()
+        player = -player
+
+
+def elo_ratings(names: List[str], results: List[Tuple[str, str, float]], iterations: int = 200) -> Dict[str, float]:
+    """
+    Fits Elo ratings to all results at once, anchored at an average of 1500
+    """
+    ratings = {name: 1500.0 for name in names}
+    games = {name: sum(1 for a, b, _ in results if name in (a, b)) for name in names}
+    for _ in range(iterations):
+        # Every step moves a rating towards the one that explains its average score
+        surplus = {name: 0.0 for name in names}
+        for a, b, score in results:
+            expected = 1 / (1 + 10 ** ((ratings[b] - ratings[a]) / 400))
+            surplus[a] += score - expected
+            surplus[b] -= score - expected
+        for name in names:
+            ratings[name] += 100 * surplus[name] / max(1, games[name])
+        mean = sum(ratings.values()) / len(ratings)
+        for name in names:
+            ratings[name] += 1500 - mean
+    return ratings
+
+
+def run_tournament(configs: List[PlayerConfig], games: int, workers: int, random_plies: int, seed: int) -> dict:
+    start_time = time.time()
+    jobs = []
+    for a, b in combinations(configs, 2):
+        for game in range(games):
+            first, second = (a, b) if game % 2 == 0 else (b, a)
+            jobs.append((first, second, random_plies, seed + len(jobs)))
+
+    results = []
+    latencies = {config.name: [] for config in configs}
+    with ProcessPoolExecutor(workers or None) as executor:
+        futures = [executor.submit(play_game, *job) for job in jobs]
+        for (first, second, _, _), future in zip(jobs, futures):
+            score, game_latencies = future.result()
+            results.append((first.name, second.name, score))
+            for name, values in game_latencies.items():
+                latencies[name].extend(values)
+    elapsed = time.time() - start_time
+
+    names = [config.name for config in configs]
+    ratings = elo_ratings(names, results)
+    players = {}
+    for config in configs:
+        name = config.name
+        scores = [score if a == name else 1 - score for a, b, score in results if name in (a, b)]
+        moves = np.array(latencies[name]) * 1000
+        players[name] = {
+            'config': config._asdict(),
+            'games': len(scores),
+            'wins': scores.count(1.0),
+            'draws': scores.count(0.5),
+            'losses': scores.count(0.0),
+            'score': sum(scores) / len(scores) if scores else 0.0,
+            'elo': ratings[name],
+            'moves': len(moves),
+            # Strength per CPU second compares engines that spend their time differently
+            'think_seconds': float(moves.sum() / 1000),
+            'latency_ms': {
+                'p50': float(np.percentile(moves, 50)) if len(moves) else 0.0,
+                'p90': float(np.percentile(moves, 90)) if len(moves) else 0.0,
+                'p99': float(np.percentile(moves, 99)) if len(moves) else 0.0,
+                'max': float(moves.max()) if len(moves) else 0.0,
+            },
+        }
+    return {
+        'games': len(results),
+        'seconds': elapsed,
+        'games_per_second': len(results) / elapsed,
+        'players': players,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--config", help="Configuration name:key=value,...", action="append")
+    parser.add_argument("-g", "--games", help="Games per pair of configurations", type=int, default=100)
+    parser.add_argument("-w", "--workers", help="Processes playing games, all cores by default", type=int, default=0)
+    parser.add_argument("-r", "--random-plies", help="Random moves at the start of every game", type=int, default=2)
+    parser.add_argument("-s", "--seed", help="Seed of the random openings", type=int, default=0)
+    parser.add_argument("-o", "--output", help="Results file", default="tournament_results.json")
+    args = parser.parse_args()
+
+    specs = args.config or ["d2:depth=2", "d4:depth=4"]
+    configs = [parse_config(spec) for spec in specs]
+    summary = run_tournament(configs, args.games, args.workers, args.random_plies, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print("{} games in {:.1f}s, {:.2f} games/s".format(summary['games'], summary['seconds'], summary['games_per_second']))
+    for name, player in sorted(summary['players'].items(), key=lambda item: -item[1]['elo']):
+        print("{:>12} elo {:7.1f}  score {:.3f}  p50 {:7.1f}ms  p99 {:7.1f}ms".format(
+            name, player['elo'], player['score'], player['latency_ms']['p50'], player['latency_ms']['p99']))
+
+
+if __name__ == "__main__":
+    main()